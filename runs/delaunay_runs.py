@@ -63,9 +63,17 @@ else:
     topo.topo[np.where(topo.topo < -500.0)] = -500.0
 
 topo.gen_mgrids()
+topo.filter_scale = params.filter_scale
+
+if params.prefilter:
+    utils.filter_topo(topo, scale=params.filter_scale)
 
 tri = delaunay.get_decomposition(
-    topo, xnp=params.delaunay_xnp, ynp=params.delaunay_ynp, padding=reader.padding
+    topo,
+    xnp=params.delaunay_xnp,
+    ynp=params.delaunay_ynp,
+    padding=reader.padding,
+    labels=params.label_raster,
 )
 writer.write_all("decomposition", tri)
 
@@ -249,7 +257,10 @@ for rect_idx in params.rect_set:
         cell.uw = uw_sa
         triangle_pair[cnt] = cell
 
-        writer.write_all(idx, cell, cell.analysis)
+        if params.sparse_output:
+            writer.write_all(idx, cell, cell.analysis.get_sparse())
+        else:
+            writer.write_all(idx, cell, cell.analysis)
         writer.populate(idx, "pmf_sg", uw_sa)
         del cell
 
@@ -307,9 +318,17 @@ for rect_idx in params.rect_set:
         res_topo = -np.sign(rel_err) * (ref_topo - topo_sum)
         res_topo -= res_topo.mean()
 
-        cell_fa, ampls_fa, uw_fa, dat_2D_fa = fa.do(
-            simplex_lat, simplex_lon, res_topo=res_topo
-        )
+        # reuse the cells and factorisations of the first pass; the FA correction keeps the grid
+        # of the first pass and differs from a rebuilt cell, see interface.first_appx.refine
+        refine_reuse = params.refine_reuse and not params.recompute_rhs
+        refine_reuse = refine_reuse and not params.dfft_first_guess
+
+        if refine_reuse:
+            cell_fa, ampls_fa, uw_fa, dat_2D_fa = fa.refine(res_topo)
+        else:
+            cell_fa, ampls_fa, uw_fa, dat_2D_fa = fa.do(
+                simplex_lat, simplex_lon, res_topo=res_topo
+            )
 
         v_extent = [dat_2D_fa.min(), dat_2D_fa.max()]
 
@@ -317,7 +336,9 @@ for rect_idx in params.rect_set:
         # dplot.show(idx, sols, v_extent=v_extent)
 
         for cnt, idx in enumerate(range(rect_idx, rect_idx + 2)):
-            if params.recompute_rhs:
+            if refine_reuse:
+                sols = sa.refine(idx, res_topo)
+            elif params.recompute_rhs:
                 sols, sols_rc = sa.do(idx, ampls_fa, res_topo=res_topo)
             else:
                 sols = sa.do(idx, ampls_fa, res_topo=res_topo)
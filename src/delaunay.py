@@ -1,9 +1,10 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view as windows
 from scipy.spatial import Delaunay
-from src import utils, var
+from src import utils
 
 
-def get_decomposition(topo, xnp=11, ynp=6, padding=0):
+def get_decomposition(topo, xnp=11, ynp=6, padding=0, labels=False):
     """
     Partitions a lat-lon domain into a number of coarser but regularly spaced points that comprises the vertices of the Delaunay triangles.
 
@@ -17,6 +18,8 @@ def get_decomposition(topo, xnp=11, ynp=6, padding=0):
         number of points in the second horizontal direction, by default 6
     padding : int, optional
         number of grid points to include as a boundary (padded) region, by default 0
+    labels : bool, optional
+        computes the ownership raster ``tri.labels`` of the simplices, by default False. See :func:`src.delaunay.get_labels`
 
     Returns
     -------
@@ -59,13 +62,50 @@ def get_decomposition(topo, xnp=11, ynp=6, padding=0):
     tri.tri_clats = tri.tri_lat_verts.sum(axis=1) / 3.0
     tri.tri_clons = tri.tri_lon_verts.sum(axis=1) / 3.0
 
+    if labels:
+        tri.labels = get_labels(tri, topo)
+
     return tri
 
 
-def get_land_cells(tri, topo, height_tol=0.5, percent_tol=0.95):
+def get_labels(tri, topo):
+    """
+    Computes which simplex of the Delaunay triangulation each topographic data point belongs to. The masks of the grid cells are then obtained by slicing and comparing the ownership raster, see :func:`src.utils.get_lat_lon_segments`.
+
+    Parameters
+    ----------
+    tri : :class:`scipy.spatial.qhull.Delaunay` instance
+        scipy Delaunay triangulation instance
+    topo : :class:`src.var.topo`
+        instance of the topography object class with the lat-lon meshgrids initialised
+
+    Returns
+    -------
+    array-like
+        2D integer array of the shape of ``topo.topo`` containing the simplex index of each data point, -1 outside of the triangulation
+
+    .. note:: Each data point belongs to exactly one simplex, also if it lies on an edge shared by two simplices.
+    """
+    points = np.stack((topo.lon_grid.ravel(), topo.lat_grid.ravel()), axis=-1)
+    labels = tri.find_simplex(points).reshape(topo.lon_grid.shape)
+
+    return labels
+
+
+def get_land_cells(
+    tri,
+    topo,
+    height_tol=0.5,
+    percent_tol=0.95,
+    demean=True,
+    use_labels=False,
+    max_pts=2**22,
+):
     """
     Land cell selector based on how much of a grid cell contains topography of a certain elevation.
 
+    The grid cells are not populated, instead the elevations are thresholded directly on the topography raster for all grid cells at once.
+
     Parameters
     ----------
     tri : :class:`scipy.spatial.qhull.Delaunay` instance
@@ -76,28 +116,111 @@ def get_land_cells(tri, topo, height_tol=0.5, percent_tol=0.95):
         elevation above `height_tol` are considered as land, by default 0.5 [m]
     percent_tol : float, optional
         cut-off percentage of topography in the given grid cell below `height_tol`. By default 0.95, i.e., at least 5% of the grid cell has to be above `heigh_tol` to be considered a land cell.
+    demean : bool, optional
+        measures the elevation relative to the mean elevation of each grid cell, as the topography of a grid cell populated by :func:`src.utils.get_lat_lon_segments`, by default True. The means are read off a summed-area table of ``topo.topo``, and the bounding boxes of the same shape are thresholded together. Otherwise, the absolute elevation is thresholded and the fractions are read off a summed-area table of the sea raster ``topo.topo <= height_tol``
+    use_labels : bool, optional
+        computes the fractions over the data points owned by each pair of triangles in the ownership raster ``tri.labels`` instead of the bounding box of the quadrilateral grid cell, by default False. See :func:`src.delaunay.get_labels`
+    max_pts : int, optional
+        maximum number of data points gathered at once if ``demean`` is True, by default 2**22
 
     Returns
     -------
     list
         list of land cell indices
     """
-    rect_set = []
-    n_tri = len(tri.tri_lat_verts)
+    tri_idxs = np.arange(len(tri.tri_lat_verts))[::2]
+    n_cells = len(tri_idxs)
+
+    if use_labels:
+        assert hasattr(
+            tri, "labels"
+        ), "use_labels requires get_decomposition(labels=True)"
+
+        owned = tri.labels >= 0
+        pairs = tri.labels[owned] // 2
+        heights = topo.topo[owned]
 
-    for tri_idx in range(n_tri)[::2]:
-        cell = var.topo_cell()
+        n_pts = np.bincount(pairs, minlength=n_cells)
+        if demean:
+            means = np.bincount(pairs, weights=heights, minlength=n_cells)
+            heights = heights - (means / np.maximum(n_pts, 1))[pairs]
 
-        print("computing idx:", tri_idx)
+        n_sea = np.bincount(pairs, weights=(heights <= height_tol), minlength=n_cells)
 
-        simplex_lat = tri.tri_lat_verts[tri_idx]
-        simplex_lon = tri.tri_lon_verts[tri_idx]
+    else:
+        # bounding boxes of the grid cells, as in src.utils.get_lat_lon_segments
+        lat_verts = tri.tri_lat_verts[tri_idxs]
+        lon_verts = tri.tri_lon_verts[tri_idxs]
 
-        utils.get_lat_lon_segments(
-            simplex_lat, simplex_lon, cell, topo, load_topo=True, filtered=False
+        lat_min = __get_closest_idxs(lat_verts.min(axis=1), topo.lat)
+        lat_max = __get_closest_idxs(lat_verts.max(axis=1), topo.lat)
+        lon_min = __get_closest_idxs(lon_verts.min(axis=1), topo.lon)
+        lon_max = __get_closest_idxs(lon_verts.max(axis=1), topo.lon)
+
+        n_pts = (lat_max - lat_min) * (lon_max - lon_min)
+        boxes = (lat_min, lat_max, lon_min, lon_max)
+
+        if demean:
+            means = __get_box_sums(topo.topo, *boxes) / np.maximum(n_pts, 1)
+
+            # the threshold depends on the grid cell, so the bounding boxes of the same shape are gathered and thresholded together
+            shapes = np.stack((lat_max - lat_min, lon_max - lon_min), axis=1)
+            n_sea = np.zeros(n_cells)
+
+            for nlat, nlon in np.unique(shapes[n_pts > 0], axis=0):
+                cnts = np.flatnonzero((shapes[:, 0] == nlat) & (shapes[:, 1] == nlon))
+                blk = max(1, max_pts // (nlat * nlon))
+
+                for start in range(0, len(cnts), blk):
+                    sel = cnts[start : start + blk]
+                    data = windows(topo.topo, (nlat, nlon))[lat_min[sel], lon_min[sel]]
+
+                    n_sea[sel] = np.count_nonzero(
+                        (data - means[sel, np.newaxis, np.newaxis]) <= height_tol,
+                        axis=(1, 2),
+                    )
+
+        else:
+            n_sea = __get_box_sums(topo.topo <= height_tol, *boxes)
+
+    is_sea = (n_sea / np.maximum(n_pts, 1)) > percent_tol
+    rect_set = tri_idxs[(~is_sea) & (n_pts > 0)]
+
+    return [int(tri_idx) for tri_idx in rect_set]
+
+
+def __get_box_sums(arr, lat_min, lat_max, lon_min, lon_max):
+    """Sums of ``arr`` over the bounding boxes ``[lat_min:lat_max, lon_min:lon_max]``, read off a summed-area table"""
+    # summed-area table with a leading row and column of zeros, accumulated in place
+    sat = np.zeros((arr.shape[0] + 1, arr.shape[1] + 1))
+    np.cumsum(arr, axis=0, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+
+    return (
+        sat[lat_max, lon_max]
+        - sat[lat_min, lon_max]
+        - sat[lat_max, lon_min]
+        + sat[lat_min, lon_min]
+    )
+
+
+def __get_closest_idxs(vals, arr, blk=256):
+    """Vectorised :func:`src.utils.get_closest_idx`, by a binary search if ``arr`` is monotonic and otherwise over blocks of ``blk`` values"""
+    arr = np.asarray(arr)
+    vals = np.asarray(vals)
+
+    if np.all(np.diff(arr) > 0):
+        # the lower neighbour wins a tie, as in argmin
+        upper = np.clip(np.searchsorted(arr, vals), 1, len(arr) - 1)
+        lower = upper - 1
+        return np.where(
+            np.abs(vals - arr[lower]) <= np.abs(arr[upper] - vals), lower, upper
         )
 
-        if not (((cell.topo <= height_tol).sum() / cell.topo.size) > percent_tol):
-            rect_set.append(tri_idx)
+    idxs = np.empty(len(vals), dtype=int)
+
+    for start in range(0, len(vals), blk):
+        dist = np.abs(arr.reshape(1, -1) - vals[start : start + blk].reshape(-1, 1))
+        idxs[start : start + blk] = dist.argmin(axis=1)
 
-    return rect_set
+    return idxs
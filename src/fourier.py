@@ -1,4 +1,5 @@
 import numpy as np
+import hashlib
 
 
 class f_trans(object):
@@ -6,7 +7,7 @@ class f_trans(object):
     Fourier transformer class
     """
 
-    def __init__(self, nhar_i, nhar_j):
+    def __init__(self, nhar_i, nhar_j, engine="separable", cache=None):
         """
         Initalises a discrete spectral space with the corresponding Fourier coefficients spanning ``nhar_i`` and ``nhar_j``.
 
@@ -16,9 +17,14 @@ class f_trans(object):
             number of spectral modes in the first horizontal direction
         nhar_j : int
             number of spectral modes in the second horizontal direction
+        engine : str, optional
+            assembly engine of :func:`src.fourier.f_trans.do_full`. ``separable`` multiplies 1D tables of complex exponentials in each horizontal direction, ``tensor`` evaluates the sine and cosine terms on the full ``(N, nhar_i, nhar_j)`` phase tensor. By default 'separable'
+        cache : :class:`src.utils.lru_cache`, optional
+            cache shared between cells to reuse the spectrum of the sampling mask on repeated cell geometries, see :func:`src.lin_reg.get_mask_spectrum`. By default None
         """
         self.nhar_i = nhar_i
         self.nhar_j = nhar_j
+        self.engine = engine
 
         self.m_i = None
         self.m_j = None
@@ -26,6 +32,17 @@ class f_trans(object):
         self.pick_kls = False
         self.components = "imag"
 
+        # cached M matrix and factorisation of the normal matrix, see src.lin_reg.do
+        self.coeff = None
+        self.chol = None
+        self.chol_key = None
+
+        # phase tables of get_block
+        self.tabs = None
+
+        self.cache = cache
+        self.cache_key = None
+
     def __get_IJ(self, cell):
         """
         Private method to compute :math:`x / \Delta x`.
@@ -48,8 +65,9 @@ class f_trans(object):
         lat_res = cell.wlat
         lon_res = cell.wlon
 
-        self.J = np.ceil((lat_m - lat_m.min()) / lat_res).astype(int)
-        self.I = np.ceil((lon_m - lon_m.min()) / lon_res).astype(int)
+        # round-off in the quotients must not shift points on the grid to the next index
+        self.J = np.ceil(np.round((lat_m - lat_m.min()) / lat_res, 8)).astype(int)
+        self.I = np.ceil(np.round((lon_m - lon_m.min()) / lon_res, 8)).astype(int)
 
     def __prepare_terms(self, cell):
         """
@@ -77,8 +95,17 @@ class f_trans(object):
             # else:
             self.m_j = np.arange(-(self.nhar_j - 1) / 2, (self.nhar_j + 1) / 2)
 
-        self.term1 = self.m_i.reshape(1, -1) * self.I.reshape(-1, 1) / self.Ni
-        self.term2 = self.m_j.reshape(1, -1) * self.J.reshape(-1, 1) / self.Nj
+    def __get_phases(self, m_i, m_j):
+        r"""
+        Private method that tabulates the complex exponentials :math:`\exp(2 \pi i m_i I / N_i)` and :math:`\exp(2 \pi i m_j J / N_j)` on the grid indices.
+        """
+        idx_i = np.arange(self.I.max() + 1).reshape(-1, 1)
+        idx_j = np.arange(self.J.max() + 1).reshape(-1, 1)
+
+        phs_i = np.exp(2.0j * np.pi * idx_i * m_i.reshape(1, -1) / self.Ni)
+        phs_j = np.exp(2.0j * np.pi * idx_j * m_j.reshape(1, -1) / self.Nj)
+
+        return phs_i, phs_j
 
     def set_kls(self, k_rng, l_rng, recompute_nhij=True, components="imag"):
         """
@@ -136,28 +163,67 @@ class f_trans(object):
             self.grad = True
         else:
             self.grad = False
+
+        self.coeff = None
+        self.chol = None
+        self.tabs = None
+
         self.__get_IJ(cell)
         self.__prepare_terms(cell)
 
-        self.term1 = np.expand_dims(self.term1, -1)
-        self.term1 = np.repeat(self.term1, self.nhar_j, -1)
-        self.term2 = np.expand_dims(self.term2, 1)
-        self.term2 = np.repeat(self.term2, self.nhar_i, 1)
+        self.cache_key = self.get_key() if self.cache is not None else None
 
-        tt_sum = self.term1 + self.term2
+        if self.engine == "tensor":
+            self.term1 = self.m_i.reshape(1, -1) * self.I.reshape(-1, 1) / self.Ni
+            self.term2 = self.m_j.reshape(1, -1) * self.J.reshape(-1, 1) / self.Nj
 
-        del self.term1
-        del self.term2
+            self.term1 = np.expand_dims(self.term1, -1)
+            self.term1 = np.repeat(self.term1, self.nhar_j, -1)
+            self.term2 = np.expand_dims(self.term2, 1)
+            self.term2 = np.repeat(self.term2, self.nhar_i, 1)
+
+            tt_sum = self.term1 + self.term2
+
+            del self.term1
+            del self.term2
+
+            if self.pick_kls:
+                tt_sum = tt_sum[:, self.k_idx, self.l_idx]
+            else:
+                tt_sum = tt_sum.reshape(tt_sum.shape[0], -1)
+
+            bcos = np.cos(2.0 * np.pi * (tt_sum))
+            bsin = np.sin(2.0 * np.pi * (tt_sum))
+
+            del tt_sum
+
+        elif self.pick_kls:
+            # only tabulate the phases of the selected (k,l)-pairs
+            k_uniq, k_inv = np.unique(self.k_idx, return_inverse=True)
+            l_uniq, l_inv = np.unique(self.l_idx, return_inverse=True)
+
+            phs_i, phs_j = self.__get_phases(self.m_i[k_uniq], self.m_j[l_uniq])
+            bexp = phs_i[:, k_inv][self.I]
+            bexp *= phs_j[:, l_inv][self.J]
+
+            del phs_i
+            del phs_j
+
+            bcos = bexp.real
+            bsin = bexp.imag
 
-        if self.pick_kls:
-            tt_sum = tt_sum[:, self.k_idx, self.l_idx]
         else:
-            tt_sum = tt_sum.reshape(tt_sum.shape[0], -1)
+            # exp(2 pi i (m_i I / Ni + m_j J / Nj)) = exp(2 pi i m_i I / Ni) * exp(2 pi i m_j J / Nj)
+            phs_i, phs_j = self.__get_phases(self.m_i, self.m_j)
+            bexp = np.expand_dims(phs_i[self.I], -1) * np.expand_dims(phs_j[self.J], 1)
+
+            del phs_i
+            del phs_j
 
-        bcos = np.cos(2.0 * np.pi * (tt_sum))
-        bsin = np.sin(2.0 * np.pi * (tt_sum))
+            bexp = bexp.reshape(bexp.shape[0], -1)
 
-        del tt_sum
+            bcos = bexp.real
+            bsin = bexp.imag
 
         if (self.nhar_i == 2) and (self.nhar_j == 2) and (self.pick_kls == False):
             Ncos = bcos[:, :]
@@ -181,6 +247,120 @@ class f_trans(object):
         self.bf_sin = Nsin
         self.nc = self.bf_cos.shape[1]
 
+        self.get_modes()
+
+    def get_key(self):
+        """
+        Computes a content-addressed key of the cell geometry, i.e., of the grid indices of the data points. The key does not depend on the spectral modes, so that cells with the same geometry share their cache entry whatever modes are selected.
+
+        Returns
+        -------
+        str
+            hexadecimal digest of the key
+        """
+        hsh = hashlib.sha1()
+
+        for arr in [self.I, self.J]:
+            hsh.update(np.ascontiguousarray(arr).tobytes())
+
+        attrs = (self.Ni, self.Nj, self.grad)
+        hsh.update(repr(attrs).encode())
+
+        return hsh.hexdigest()
+
+    def get_block(self, rows):
+        """
+        Assembles a block of rows of the ``M`` matrix, i.e., the sine and cosine terms evaluated at a subset of the data points, without assembling the full matrix. Use this method for the memory-bounded linear regression, see :func:`src.lin_reg.get_normal_chunked`.
+
+        Parameters
+        ----------
+        rows : slice or array-like
+            indices of the data points
+
+        Returns
+        -------
+        array-like
+            2D array corresponding to the rows of the ``M`` matrix
+
+        .. note:: Requires the wavenumbers to be initialised, i.e., :func:`src.fourier.f_trans.do_modes` or :func:`src.fourier.f_trans.do_full` has to be called first.
+        """
+        if self.tabs is None:
+            kks = np.concatenate((self.k_cos, self.k_sin))
+            lls = np.concatenate((self.l_cos, self.l_sin))
+
+            # tabulate the phases of each distinct (k,l)-pair once
+            _, uniq, inv = np.unique(
+                np.stack((kks, lls)), axis=1, return_index=True, return_inverse=True
+            )
+            phs_i, phs_j = self.__get_phases(kks[uniq], lls[uniq])
+            self.tabs = (phs_i, phs_j, inv.ravel())
+
+        phs_i, phs_j, inv = self.tabs
+        ncos = len(self.k_cos)
+
+        bexp = phs_i[self.I[rows]]
+        bexp *= phs_j[self.J[rows]]
+
+        block = np.empty((bexp.shape[0], len(inv)))
+        block[:, :ncos] = bexp.real[:, inv[:ncos]]
+        block[:, ncos:] = bexp.imag[:, inv[ncos:]]
+
+        return block
+
+    def do_modes(self, cell, grad=False):
+        """
+        Computes the grid indices of the data points and the wavenumbers of the Fourier coefficients without assembling the ``M`` matrix. Use this method in place of :func:`src.fourier.f_trans.do_full` for the matrix-free linear regression, see :func:`src.lin_reg.get_operator`.
+
+        Parameters
+        ----------
+        cell : :class:`src.var.topo_cell` instance
+            cell object instance
+        grad : bool, optional
+            deprecated argument, by default False
+        """
+        self.typ = "full"
+        self.grad = grad is True
+
+        self.coeff = None
+        self.chol = None
+        self.tabs = None
+
+        self.__get_IJ(cell)
+        self.__prepare_terms(cell)
+
+        self.cache_key = self.get_key() if self.cache is not None else None
+
+        self.get_modes()
+        self.nc = len(self.k_cos)
+
+    def get_modes(self):
+        """
+        Computes the wavenumbers of the columns in the ``M`` matrix assembled by :func:`src.fourier.f_trans.do_full`.
+
+        The wavenumbers are stored in ``k_cos``, ``l_cos`` for the cosine terms and in ``k_sin``, ``l_sin`` for the sine terms, following the column ordering of ``bf_cos`` and ``bf_sin``.
+
+        .. note:: Requires ``m_i`` and ``m_j`` to be initialised, i.e., :func:`src.fourier.f_trans.do_full` has to be called first.
+        """
+        if self.pick_kls:
+            k_cos = self.m_i[self.k_idx]
+            l_cos = self.m_j[self.l_idx]
+
+            self.k_cos, self.l_cos = k_cos, l_cos
+            self.k_sin, self.l_sin = k_cos, l_cos
+
+        else:
+            kks = np.repeat(self.m_i, self.nhar_j)
+            lls = np.tile(self.m_j, self.nhar_i)
+
+            if (self.nhar_i == 2) and (self.nhar_j == 2):
+                cos_start, sin_start = 0, 1
+            else:
+                cos_start = int(self.nhar_j / 2 - 1)
+                sin_start = int(self.nhar_j / 2)
+
+            self.k_cos, self.l_cos = kks[cos_start:], lls[cos_start:]
+            self.k_sin, self.l_sin = kks[sin_start:], lls[sin_start:]
+
     def do_axial(self, cell, alpha=0.0):
         """
         Computes spectral modes along the ``(k,l)``-axes.
@@ -274,8 +454,7 @@ class f_trans(object):
 
             fourier_coeff = np.zeros((nhar_i, nhar_j), dtype=np.complex_)
 
-            for cnt, (row, col) in enumerate(zip(self.k_idx, self.l_idx)):
-                fourier_coeff[row, col] = cos_terms[cnt] + 1.0j * sin_terms[cnt]
+            fourier_coeff[self.k_idx, self.l_idx] = cos_terms + 1.0j * sin_terms
             fourier_coeff = fourier_coeff.reshape(nhar_i, nhar_j).swapaxes(1, 0)
 
         if self.typ == "axial":
@@ -400,12 +400,15 @@ class writer(object):
             "kks",
             "lls",
             "recon",
+            # sparse representation of the 'analysis' object
+            "flat_idx",
         ]
 
         self.ATTRS = [
             # vars from the 'analysis' object
             "wlat",
             "wlon",
+            "grid_shape",
         ]
 
         if debug:
@@ -466,14 +469,16 @@ class writer(object):
         ----------
         idx : str or int
             group name to write the attributes or datasets
+
+        .. note:: Unset attributes, i.e., None, are skipped. A sparse :class:`src.var.analysis` instance is written as the flat arrays ``ampls``, ``kks`` and ``lls`` together with their indices ``flat_idx`` into the dense spectral grid of shape ``grid_shape``, see :func:`src.var.analysis.get_sparse`.
         """
         for arg in args:
             for attr in self.PATHS:
-                if hasattr(arg, attr):
+                if getattr(arg, attr, None) is not None:
                     self.populate(idx, attr, getattr(arg, attr))
 
             for attr in self.ATTRS:
-                if hasattr(arg, attr):
+                if getattr(arg, attr, None) is not None:
                     self.write_attr(idx, attr, getattr(arg, attr))
 
     def write_attr(self, idx, key, value):
@@ -4,7 +4,9 @@ Linear regression module
 
 import numpy as np
 import scipy.linalg as la
-from scipy.sparse.linalg import gmres
+import tracemalloc
+import scipy.fft as sfft
+from scipy.sparse.linalg import gmres, cg, minres, lsqr, LinearOperator
 
 
 def get_coeffs(fobj):
@@ -34,8 +36,623 @@ def get_coeffs(fobj):
     return coeff
 
 
-def do(fobj, cell, lmbda=0.0, iter_solve=True, save_coeffs=False):
+def get_mask_spectrum(fobj):
+    r"""Computes the 2D DFT of the sampling mask on the index grid of the cell.
+
+    The sampled data points are given by the integer grid indices ``(I,J)`` computed in :class:`src.fourier.f_trans`. Since the wavenumbers are integers, the phases :math:`\exp(2 \pi i (k I / N_i + l J / N_j))` are periodic in ``I`` and ``J`` with periods ``Ni`` and ``Nj``, and the mask can be folded onto a ``(Nj,Ni)`` grid without loss of accuracy.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class.
+
+    Returns
+    -------
+    array-like
+        2D complex array ``S`` such that ``S[l % Nj, k % Ni]`` is the sum of :math:`\exp(2 \pi i (k I / N_i + l J / N_j))` over all data points.
+
+    .. note:: The spectrum only depends on the cell geometry. It is kept in the cache of ``fobj``, if any, and shared by all cells with the same geometry, whatever spectral modes they select.
+    """
+    if __has_cache(fobj):
+        spec = fobj.cache.get(fobj.cache_key, "spectrum")
+        if spec is not None:
+            return spec
+
+    Ni, Nj = fobj.Ni, fobj.Nj
+
+    wgts = np.zeros((Nj, Ni))
+    np.add.at(wgts, (fobj.J % Nj, fobj.I % Ni), 1.0)
+
+    if fobj.grad:
+        wgts *= 2.0
+
+    spec = np.conj(np.fft.fft2(wgts))
+
+    if __has_cache(fobj):
+        fobj.cache.put(fobj.cache_key, "spectrum", spec)
+
+    return spec
+
+
+def get_normal_fft(fobj):
+    r"""Assembles the normal matrix :math:`M^\top M` from the 2D DFT of the sampling mask.
+
+    Products of the sine and cosine terms are expanded into sums and differences of the wavenumbers, e.g.,
+
+    .. math:: \cos \theta_a \cos \theta_b = \frac{1}{2} \left[ \cos(\theta_a - \theta_b) + \cos(\theta_a + \theta_b) \right],
+
+    so that every entry of :math:`M^\top M` is a lookup into the spectrum computed by :func:`src.lin_reg.get_mask_spectrum`. The result is identical to the dense product up to round-off.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, with the wavenumbers computed by :func:`src.fourier.f_trans.get_modes`.
+
+    Returns
+    -------
+    array-like
+        2D array corresponding to :math:`M^\top M`.
+    """
+    Ni, Nj = fobj.Ni, fobj.Nj
+    spec = get_mask_spectrum(fobj)
+
+    def lookup(kks, lls):
+        kks = np.rint(kks).astype(int)
+        lls = np.rint(lls).astype(int)
+        return spec[lls % Nj, kks % Ni]
+
+    def pair(ka, la, kb, lb):
+        diff = lookup(
+            ka.reshape(-1, 1) - kb.reshape(1, -1), la.reshape(-1, 1) - lb.reshape(1, -1)
+        )
+        summ = lookup(
+            ka.reshape(-1, 1) + kb.reshape(1, -1), la.reshape(-1, 1) + lb.reshape(1, -1)
+        )
+        return diff, summ
+
+    k_cos, l_cos = fobj.k_cos, fobj.l_cos
+    k_sin, l_sin = fobj.k_sin, fobj.l_sin
+
+    diff, summ = pair(k_cos, l_cos, k_cos, l_cos)
+    E_cc = 0.5 * (diff.real + summ.real)
+
+    diff, summ = pair(k_sin, l_sin, k_sin, l_sin)
+    E_ss = 0.5 * (diff.real - summ.real)
+
+    diff, summ = pair(k_cos, l_cos, k_sin, l_sin)
+    E_cs = 0.5 * (summ.imag - diff.imag)
+
+    return np.block([[E_cc, E_cs], [E_cs.T, E_ss]])
+
+
+def get_normal_diag(fobj):
+    r"""Computes the diagonal of the normal matrix :math:`M^\top M` from the 2D DFT of the sampling mask.
+
+    Uses :math:`\cos^2 \theta = (1 + \cos 2\theta) / 2` and :math:`\sin^2 \theta = (1 - \cos 2\theta) / 2`.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, with the wavenumbers computed by :func:`src.fourier.f_trans.get_modes`.
+
+    Returns
+    -------
+    array-like
+        1D array containing the diagonal of :math:`M^\top M`.
+    """
+    Ni, Nj = fobj.Ni, fobj.Nj
+    spec = get_mask_spectrum(fobj).real
+
+    def lookup(kks, lls):
+        kks = np.rint(2.0 * kks).astype(int)
+        lls = np.rint(2.0 * lls).astype(int)
+        return spec[lls % Nj, kks % Ni]
+
+    npts = spec[0, 0]
+    diag_cos = 0.5 * (npts + lookup(fobj.k_cos, fobj.l_cos))
+    diag_sin = 0.5 * (npts - lookup(fobj.k_sin, fobj.l_sin))
+
+    return np.concatenate((diag_cos, diag_sin))
+
+
+def get_rhs_fft(fobj, data):
+    r"""Computes the right-hand side :math:`M^\top h` from the 2D real DFT of the data.
+
+    The data is scattered onto the ``(Nj,Ni)`` index grid of the cell, see :func:`src.lin_reg.get_mask_spectrum`, and its spectrum is gathered at the wavenumbers of the Fourier coefficients. The cosine terms are the real and the sine terms the imaginary parts of the complex exponentials. Costs :math:`O(N \log N)` instead of :math:`O(N n_c)`.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, with the wavenumbers computed by :func:`src.fourier.f_trans.get_modes`.
+    data : array-like
+        vector-like data ``h``, e.g., ``cell.topo_m``
+
+    Returns
+    -------
+    array-like
+        1D array corresponding to :math:`M^\top h`.
+    """
+    Ni, Nj = fobj.Ni, fobj.Nj
+    II, JJ = fobj.I % Ni, fobj.J % Nj
+
+    if fobj.grad:
+        II, JJ = np.tile(II, 2), np.tile(JJ, 2)
+
+    grid = np.zeros((Nj, Ni))
+    np.add.at(grid, (JJ, II), data.ravel())
+    spec = np.fft.rfft2(grid)
+
+    def lookup(kks, lls):
+        kks = np.rint(kks).astype(int) % Ni
+        lls = np.rint(lls).astype(int) % Nj
+
+        # the negative half of the spectrum of the real-valued grid is its complex conjugate
+        flip = kks > Ni // 2
+        kks[flip] = -kks[flip] % Ni
+        lls[flip] = -lls[flip] % Nj
+
+        vals = spec[lls, kks]
+        return np.where(flip, vals, np.conj(vals))
+
+    h_cos = lookup(fobj.k_cos, fobj.l_cos).real
+    h_sin = lookup(fobj.k_sin, fobj.l_sin).imag
+
+    return np.concatenate((h_cos, h_sin))
+
+
+def plan_chunks(fobj, max_bytes=2**28, verbose=False):
+    """Memory planner of the chunked assembly, see :func:`src.lin_reg.get_normal_chunked`.
+
+    The memory required to assemble a block of rows of the ``M`` matrix with :func:`src.fourier.f_trans.get_block` grows linearly with the number of rows, while the normal matrix, its product temporary and the phase tables are allocated once.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, initialised with :func:`src.fourier.f_trans.do_modes`.
+    max_bytes : int, optional
+        memory budget in bytes, by default 2**28, i.e., 256 MiB
+    verbose : bool, optional
+        reports a memory budget below the minimum of a single row, by default False
+
+    Returns
+    -------
+    n_rows : int
+        number of rows per block
+    pred_peak : int
+        predicted peak memory in bytes
+    """
+    ncos, nsin = len(fobj.k_cos), len(fobj.k_sin)
+    nc = ncos + nsin
+    npts = len(fobj.I)
+
+    # number of distinct (k,l)-pairs, i.e., of columns of the complex exponentials
+    kls = np.stack(
+        (
+            np.concatenate((fobj.k_cos, fobj.k_sin)),
+            np.concatenate((fobj.l_cos, fobj.l_sin)),
+        )
+    )
+    n_modes = np.unique(kls, axis=1).shape[1]
+
+    # normal matrix and the temporary of the block product, right-hand side and phase tables
+    fixed = 2 * 8 * nc**2 + 8 * nc + 16 * n_modes * (fobj.I.max() + fobj.J.max() + 2)
+    # complex exponentials, and either a second gathered phase table or the block and a gathered real or imaginary part
+    per_row = 16 * n_modes + max(16 * n_modes, 8 * nc + 8 * max(ncos, nsin))
+
+    n_rows = int(min(max((max_bytes - fixed) // per_row, 1), npts))
+
+    if verbose and (fixed + per_row > max_bytes):
+        print(
+            "memory budget of %i bytes is below the minimum of %i bytes"
+            % (max_bytes, fixed + per_row)
+        )
+
+    return n_rows, fixed + n_rows * per_row
+
+
+def get_normal_chunked(fobj, data, max_bytes=2**28, plan=None):
+    r"""Accumulates the normal matrix :math:`M^\top M` and the right-hand side :math:`M^\top h` over blocks of rows of the ``M`` matrix, without assembling the full matrix.
+
+    The number of rows per block is chosen by :func:`src.lin_reg.plan_chunks` such that the peak memory stays within ``max_bytes``, independent of the number of data points. The predicted and the measured peak memory in bytes are kept in ``fobj.mem_pred`` and ``fobj.mem_peak``.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, initialised with :func:`src.fourier.f_trans.do_modes`.
+    data : array-like
+        vector-like data ``h``, e.g., ``cell.topo_m``
+    max_bytes : int, optional
+        memory budget in bytes, by default 2**28, i.e., 256 MiB
+    plan : tuple, optional
+        output of :func:`src.lin_reg.plan_chunks` for ``fobj`` and ``max_bytes``, by default None, i.e., computed here
+
+    Returns
+    -------
+    E_tilda_lm : array-like
+        2D array corresponding to :math:`M^\top M`
+    h_tilda_l : array-like
+        1D array corresponding to :math:`M^\top h`
+    """
+    assert not fobj.grad, "chunked regression does not support grad=True"
+
+    if plan is None:
+        plan = plan_chunks(fobj, max_bytes)
+    n_rows, fobj.mem_pred = plan
+    data = data.ravel()
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    nc = len(fobj.k_cos) + len(fobj.k_sin)
+    E_tilda_lm = np.zeros((nc, nc))
+    h_tilda_l = np.zeros(nc)
+
+    for row in range(0, len(data), n_rows):
+        rows = slice(row, row + n_rows)
+        block = fobj.get_block(rows)
+
+        E_tilda_lm += np.dot(block.T, block)
+        h_tilda_l += np.dot(block.T, data[rows])
+
+        del block
+
+    fobj.mem_peak = tracemalloc.get_traced_memory()[1] - start
+    if not tracing:
+        tracemalloc.stop()
+
+    return E_tilda_lm, h_tilda_l
+
+
+def get_operator_chunked(fobj, max_bytes=2**28, plan=None):
+    """Representation of the ``M`` matrix whose products are evaluated over blocks of rows, see :func:`src.lin_reg.get_normal_chunked`.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, initialised with :func:`src.fourier.f_trans.do_modes`.
+    max_bytes : int, optional
+        memory budget in bytes, by default 2**28, i.e., 256 MiB
+    plan : tuple, optional
+        output of :func:`src.lin_reg.plan_chunks` for ``fobj`` and ``max_bytes``, by default None, i.e., computed here
+
+    Returns
+    -------
+    :class:`scipy.sparse.linalg.LinearOperator` instance
+        linear operator with the shape of the ``M`` matrix.
+    """
+    if plan is None:
+        plan = plan_chunks(fobj, max_bytes)
+    n_rows, _ = plan
+    npts = len(fobj.I)
+    nc = len(fobj.k_cos) + len(fobj.k_sin)
+
+    def matvec(a_m):
+        res = np.empty(npts)
+        for row in range(0, npts, n_rows):
+            rows = slice(row, row + n_rows)
+            res[rows] = fobj.get_block(rows).dot(a_m.ravel())
+        return res
+
+    def rmatvec(res):
+        res = res.ravel()
+        h_tilda_l = np.zeros(nc)
+        for row in range(0, npts, n_rows):
+            rows = slice(row, row + n_rows)
+            h_tilda_l += np.dot(fobj.get_block(rows).T, res[rows])
+        return h_tilda_l
+
+    return LinearOperator((npts, nc), matvec=matvec, rmatvec=rmatvec, dtype=float)
+
+
+def is_orthogonal(fobj):
+    r"""Checks whether the columns of the ``M`` matrix are mutually orthogonal, i.e., whether :math:`M^\top M` is diagonal.
+
+    This is the case if the data points sample every point of the ``(Nj,Ni)`` index grid equally often, e.g., for a quadrilateral cell with a mask of ones, so that the 2D DFT of the sampling mask vanishes except for the zero wavenumber, and if no two cosine or sine terms alias to the same wavenumber pair :math:`\pm (k,l)` modulo ``(Ni,Nj)``.
+
+    The check is exact and relies on the grid indices of :func:`src.fourier.f_trans.do_full`, which are rounded before taking the ceiling. If round-off shifts data points to the next index, some rows or columns of the index grid are empty and :math:`M^\top M` is not diagonal.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, with the wavenumbers computed by :func:`src.fourier.f_trans.get_modes`.
+
+    Returns
+    -------
+    bool
+        True if :math:`M^\top M` is diagonal
+    """
+    Ni, Nj = fobj.Ni, fobj.Nj
+
+    wgts = np.zeros((Nj, Ni))
+    np.add.at(wgts, (fobj.J % Nj, fobj.I % Ni), 1.0)
+
+    if wgts.min() != wgts.max():
+        return False
+
+    for kks, lls in [(fobj.k_cos, fobj.l_cos), (fobj.k_sin, fobj.l_sin)]:
+        kks = np.rint(kks).astype(int)
+        lls = np.rint(lls).astype(int)
+
+        # identify the wavenumber pairs (k,l) and (-k,-l) on the index grid
+        pos = (kks % Ni) * Nj + (lls % Nj)
+        neg = (-kks % Ni) * Nj + (-lls % Nj)
+        keys = np.minimum(pos, neg)
+
+        if len(np.unique(keys)) != len(keys):
+            return False
+
+    return True
+
+
+def get_operator(fobj):
+    r"""Matrix-free representation of the ``M`` matrix.
+
+    The product :math:`M a` scatters the Fourier amplitudes onto the ``(Nj,Ni)`` spectral grid and gathers the inverse FFT at the data points. The transpose product :math:`M^\top r` scatters the vector ``r`` onto the ``(Nj,Ni)`` index grid and gathers its FFT at the wavenumbers of the Fourier coefficients. Neither product requires the dense ``M`` matrix.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class, initialised with :func:`src.fourier.f_trans.do_modes`.
+
+    Returns
+    -------
+    :class:`scipy.sparse.linalg.LinearOperator` instance
+        linear operator with the shape of the ``M`` matrix.
+    """
+    assert not fobj.grad, "matrix-free regression does not support grad=True"
+
+    Ni, Nj = fobj.Ni, fobj.Nj
+    II, JJ = fobj.I % Ni, fobj.J % Nj
+
+    kks = np.rint(np.concatenate((fobj.k_cos, fobj.k_sin))).astype(int) % Ni
+    lls = np.rint(np.concatenate((fobj.l_cos, fobj.l_sin))).astype(int) % Nj
+
+    # the cosine terms are the real and the sine terms the imaginary parts of the complex exponentials
+    phase = np.concatenate((np.ones(len(fobj.k_cos)), -1.0j * np.ones(len(fobj.k_sin))))
+
+    def matvec(a_m):
+        spec = np.zeros((Nj, Ni), dtype=complex)
+        np.add.at(spec, (lls, kks), phase * a_m.ravel())
+        return (np.fft.ifft2(spec) * spec.size).real[JJ, II]
+
+    def rmatvec(res):
+        return get_rhs_fft(fobj, res)
+
+    return LinearOperator(
+        (len(II), len(kks)), matvec=matvec, rmatvec=rmatvec, dtype=float
+    )
+
+
+def __do_diag(fobj, data, lmbda, keep_coeffs=False):
+    r"""Helper function that solves the linear regression with a diagonal :math:`M^\top M` by an elementwise division"""
+    E_diag = get_normal_diag(fobj)
+    E_diag += E_diag.mean() * lmbda
+
+    h_tilda_l = get_rhs_fft(fobj, data)
+
+    # columns that vanish on the grid, e.g., the sine term of the zero wavenumber, are dropped
+    nonzero = E_diag > np.finfo(float).eps * E_diag.max() * len(E_diag)
+    a_m = np.zeros_like(h_tilda_l)
+    a_m[nonzero] = h_tilda_l[nonzero] / E_diag[nonzero]
+
+    if hasattr(fobj, "bf_cos") or (fobj.coeff is not None):
+        data_recons = __get_basis(fobj, "dense").dot(a_m)
+    else:
+        data_recons = get_operator(fobj).matvec(a_m)
+
+    if not keep_coeffs:
+        fobj.coeff = None
+
+    fobj.info = 0
+
+    return a_m, data_recons
+
+
+def __has_cache(fobj):
+    """Helper function that checks whether ``fobj`` has a cache and a key of its cell geometry, see :func:`src.fourier.f_trans.get_key`"""
+    return (fobj.cache is not None) and (fobj.cache_key is not None)
+
+
+def __get_basis(fobj, assembly, max_bytes=2**28, plan=None):
+    """Helper function that returns the ``M`` matrix, or its matrix-free representation, and keeps it in ``fobj.coeff``"""
+    if assembly == "matfree":
+        coeff = get_operator(fobj)
+    elif assembly == "chunked":
+        coeff = get_operator_chunked(fobj, max_bytes, plan)
+    elif hasattr(fobj, "bf_cos"):
+        coeff = get_coeffs(fobj)
+    else:
+        # the sine and cosine terms were consumed by a previous call on the same geometry
+        assert (
+            fobj.coeff is not None
+        ), "the M matrix was released after the last linear regression, see the keep_coeffs argument of src.lin_reg.do"
+        coeff = fobj.coeff
+
+    fobj.coeff = coeff
+
+    return coeff
+
+
+def __get_normal(fobj, coeff, assembly):
+    r"""Helper function that assembles the unregularised normal matrix :math:`M^\top M`, from the cached spectrum of the sampling mask if available"""
+    if (assembly == "fft") or __has_cache(fobj):
+        return get_normal_fft(fobj)
+    else:
+        return np.dot(coeff.T, coeff)
+
+
+def get_sketch(npts, nsk, sketch="srtt", seed=None):
+    r"""Generates a random sketching operator that embeds vectors of length ``npts`` into ``nsk`` dimensions.
+
+    Parameters
+    ----------
+    npts : int
+        number of rows of the ``M`` matrix, i.e., of data points
+    nsk : int
+        number of rows of the sketch
+    sketch : str, optional
+        ``srtt`` is a subsampled randomised trigonometric transform, i.e., random sign flips followed by an orthonormal DCT and a uniform row sampling, applied in :math:`O(N \log N)` per column. ``gaussian`` is a dense Gaussian matrix, applied in :math:`O(N n_{sk})` per column. By default 'srtt'
+    seed : int, optional
+        seed of the random number generator, by default None
+
+    Returns
+    -------
+    function
+        function that applies the sketch to the rows of a 1D or 2D array
+    """
+    rng = np.random.default_rng(seed)
+
+    if sketch == "srtt":
+        # zero-padding to a length with small prime factors keeps the transform isometric
+        nfft = sfft.next_fast_len(npts, real=True)
+        signs = rng.choice([-1.0, 1.0], size=npts)
+        rows = rng.choice(nfft, size=nsk, replace=False)
+        scale = np.sqrt(nfft / nsk)
+
+        def apply(arr):
+            # transforms along the contiguous axis of the transposed array
+            arr = signs * arr.T
+            return scale * sfft.dct(arr, n=nfft, norm="ortho", axis=-1)[..., rows].T
+
+    elif sketch == "gaussian":
+        smat = rng.standard_normal((nsk, npts)) / np.sqrt(nsk)
+
+        def apply(arr):
+            return np.dot(smat, arr)
+
+    else:
+        assert 0, "unknown sketch %s" % sketch
+
+    return apply
+
+
+def do_sketch(
+    fobj, cell, lmbda=0.0, solver="lsqr", oversample=4.0, sketch="srtt", seed=None
+):
+    r"""
+    Does the linear regression with a randomised sketch of the ``M`` matrix, without assembling :math:`M^\top M`.
+
+    The sketch :math:`S` embeds the :math:`N` rows of ``M`` into :math:`n_{sk} = \mathrm{oversample} \cdot n_c` rows. Writing :math:`\mu` for the trace-scaled regularisation of :func:`src.lin_reg.do`, ``sketch`` solves the small problem
+
+    .. math:: \min_a \| S M a - S h \|^2 + \mu \| a \|^2
+
+    directly, while ``lsqr`` uses the triangular factor :math:`R` of the QR decomposition of the sketched problem as a right preconditioner of LSQR on the full problem, warm-started from the sketched solution. ``lsqr`` converges to the solution of :func:`src.lin_reg.do` in a few iterations; ``sketch`` trades accuracy for speed through ``oversample``.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class.
+    cell : :class:`src.var.topo_cell` instance
+        cell object instance
+    lmbda : float, optional
+        regularisation parameter, by default 0.0
+    solver : str, optional
+        ``sketch`` or ``lsqr``, by default 'lsqr'
+    oversample : float, optional
+        ratio of the number of rows of the sketch to the number of Fourier coefficients, by default 4.0
+    sketch : str, optional
+        ``srtt`` or ``gaussian``, see :func:`src.lin_reg.get_sketch`. By default 'srtt'
+    seed : int, optional
+        seed of the random number generator, by default None
+
+    Returns
+    -------
+    a_m : list
+        list of Fourier amplitudes corresponding to the unknown vector in the linear problem
+    data_recons : like
+        vector-like topography reconstructed from ``a_m``
+
+    .. note:: The sketched residual norm :math:`\| S (M a_m - h) \|_2`, an estimate of :math:`\| M a_m - h \|_2` to within a factor of :math:`1 \pm O(1/\sqrt{\mathrm{oversample}})`, is kept in ``fobj.res_est``. As for the iterative solvers of :func:`src.lin_reg.do`, the convergence flag of LSQR is kept in ``fobj.info``, non-zero if LSQR stopped without converging, and the number of iterations in ``fobj.n_iters``.
     """
+    assert solver in ["sketch", "lsqr"]
+
+    if fobj.grad:
+        cell.get_grad()
+        data = cell.grad_topo_m
+    else:
+        data = cell.topo_m
+
+    data = data.ravel()
+    coeff = __get_basis(fobj, "dense")
+    npts, nc = coeff.shape
+
+    nsk = min(int(np.ceil(oversample * nc)), npts)
+    apply = get_sketch(npts, nsk, sketch=sketch, seed=seed)
+
+    coeff_sk = apply(coeff)
+    data_sk = apply(data)
+
+    # trace-scaled regularisation as in do(), with tr(M^T M) the squared Frobenius norm of M
+    mu = lmbda * np.einsum("ij,ij->", coeff, coeff) / nc
+    reg = np.sqrt(mu) * np.eye(nc)
+
+    qq, rr = la.qr(np.vstack((coeff_sk, reg)), mode="economic")
+    a_m = la.solve_triangular(rr, np.dot(qq[:nsk].T, data_sk))
+    fobj.info = 0
+    fobj.n_iters = 0
+
+    if solver == "lsqr":
+
+        def matvec(yy):
+            xx = la.solve_triangular(rr, yy.ravel())
+            return np.concatenate((coeff.dot(xx), np.sqrt(mu) * xx))
+
+        def rmatvec(res):
+            res = res.ravel()
+            zz = np.dot(coeff.T, res[:npts]) + np.sqrt(mu) * res[npts:]
+            return la.solve_triangular(rr, zz, trans="T")
+
+        op = LinearOperator(
+            (npts + nc, nc), matvec=matvec, rmatvec=rmatvec, dtype=float
+        )
+
+        sol = lsqr(
+            op,
+            np.concatenate((data, np.zeros(nc))),
+            atol=1e-12,
+            btol=1e-12,
+            x0=rr.dot(a_m),
+        )
+        a_m = la.solve_triangular(rr, sol[0])
+
+        # istop is 1, 2, 4 or 5 on convergence, 0 if the solution is zero
+        istop = sol[1]
+        fobj.info = 0 if istop in [0, 1, 2, 4, 5] else istop
+        fobj.n_iters = sol[2]
+
+        if fobj.info != 0:
+            print("lsqr did not converge, istop = %i" % istop)
+
+    fobj.res_est = np.linalg.norm(coeff_sk.dot(a_m) - data_sk)
+
+    data_recons = coeff.dot(a_m)
+
+    return a_m, data_recons
+
+
+def do(
+    fobj,
+    cell,
+    lmbda=0.0,
+    iter_solve=True,
+    save_coeffs=False,
+    assembly="dense",
+    solver=None,
+    oversample=4.0,
+    sketch="srtt",
+    seed=None,
+    x0=None,
+    rtol=1e-5,
+    orthogonal=None,
+    max_bytes=2**28,
+    keep_coeffs=False,
+    verbose=False,
+):
+    r"""
     Does the linear regression
 
     Parameters
@@ -50,6 +667,32 @@ def do(fobj, cell, lmbda=0.0, iter_solve=True, save_coeffs=False):
         toggles between using direct or iterative solver, by default True
     save_coeffs : bool, optional
         skips the linear regression and just saves the generated ``M`` matrix for diagnostics and debugging, by default False
+    assembly : str, optional
+        ``dense`` assembles :math:`M^\top M` with a dense matrix product, ``fft`` assembles it from the 2D DFT of the cell mask, see :func:`src.lin_reg.get_normal_fft`, and :math:`M^\top h` from the 2D DFT of the data, see :func:`src.lin_reg.get_rhs_fft`. ``matfree`` does not assemble ``M`` nor :math:`M^\top M`, see :func:`src.lin_reg.get_operator`. ``chunked`` accumulates :math:`M^\top M` and :math:`M^\top h` over blocks of rows of ``M`` within the memory budget ``max_bytes``, see :func:`src.lin_reg.get_normal_chunked`. ``matfree`` and ``chunked`` require ``fobj`` to be initialised with :func:`src.fourier.f_trans.do_modes`. By default 'dense'
+    solver : str, optional
+        ``gmres``, ``cg``, ``minres``, ``cholesky``, ``sketch``, ``lsqr`` or ``inv``, by default None, i.e., ``gmres`` if ``iter_solve`` is True and ``cholesky`` otherwise. ``assembly='matfree'`` requires ``cg`` or ``minres``, and defaults to ``cg``.
+
+        ``cholesky`` keeps the factorisation of the regularised :math:`M^\top M` in ``fobj.chol``. Repeated calls on the same geometry, e.g., with a modified ``cell.topo_m``, reuse the factorisation until :func:`src.fourier.f_trans.do_full` is called again.
+
+        ``sketch`` and ``lsqr`` are randomised solvers for tall ``M`` matrices, see :func:`src.lin_reg.do_sketch`. They require the ``dense`` or ``fft`` assembly.
+    oversample : float, optional
+        accuracy of the ``sketch`` solver, see :func:`src.lin_reg.do_sketch`. By default 4.0
+    sketch : str, optional
+        ``srtt`` or ``gaussian`` sketching operator of the ``sketch`` and ``lsqr`` solvers, see :func:`src.lin_reg.get_sketch`. By default 'srtt'
+    seed : int, optional
+        seed of the random sketch, by default None
+    x0 : array-like, optional
+        initial guess of the ``gmres``, ``cg`` and ``minres`` solvers, i.e., the solution of a previous solve over the same spectral modes, see :func:`wrappers.interface.second_appx.do`. It is rescaled to minimise the initial residual, and ignored if its size does not match the number of Fourier coefficients. By default None
+    rtol : float, optional
+        relative tolerance of the ``gmres``, ``cg`` and ``minres`` solvers on the true residual of the regularised normal equations, by default 1e-5. ``minres`` stops on an estimate of the residual and is restarted from its solution with a tighter tolerance until the true residual meets ``rtol``. The true residual is kept in ``fobj.res_norm``. For the same residual, ``minres`` and ``gmres`` stop further from the exact solution than ``cg`` as ``lmbda`` decreases, e.g., by a factor of about 2 at ``lmbda = 0.01`` and 5 at ``lmbda = 0.001``
+    orthogonal : bool, optional
+        solves the linear regression by an elementwise division if :math:`M^\top M` is diagonal, e.g., for quadrilateral cells with a mask of ones. Neither ``M`` nor :math:`M^\top M` is assembled, and ``solver`` is ignored. By default None, i.e., detected with :func:`src.lin_reg.is_orthogonal`
+    max_bytes : int, optional
+        memory budget in bytes of the ``chunked`` assembly, by default 2**28, i.e., 256 MiB
+    keep_coeffs : bool, optional
+        keeps the ``M`` matrix in ``fobj.coeff`` after the linear regression, e.g., for another solve on the same geometry with :func:`wrappers.interface.get_pmf.refine`. By default False, i.e., the ``M`` matrix is only kept together with the factorisation of the ``cholesky`` solver
+    verbose : bool, optional
+        reports a memory budget ``max_bytes`` below the minimum of the ``chunked`` assembly, see :func:`src.lin_reg.plan_chunks`. By default False
 
     Returns
     -------
@@ -57,34 +700,162 @@ def do(fobj, cell, lmbda=0.0, iter_solve=True, save_coeffs=False):
         list of Fourier amplitudes corresponding to the unknown vector in the linear problem
     data_recons : like
         vector-like topography reconstructed from ``a_m``
+
+    .. note:: The iterative solvers keep the convergence flag in ``fobj.info``, the number of iterations in ``fobj.n_iters`` and the relative residual :math:`\| E a_m - h \|_2 / \| h \|_2` of the normal equations in ``fobj.res_norm``.
     """
+    if solver in ["sketch", "lsqr"] and not save_coeffs:
+        assert assembly in [
+            "dense",
+            "fft",
+        ], "the %s solver requires the dense M matrix, got the %s assembly" % (
+            solver,
+            assembly,
+        )
+
+        a_m, data_recons = do_sketch(
+            fobj,
+            cell,
+            lmbda,
+            solver=solver,
+            oversample=oversample,
+            sketch=sketch,
+            seed=seed,
+        )
+
+        if not keep_coeffs:
+            fobj.coeff = None
+
+        return a_m, data_recons
+
     if fobj.grad:
         cell.get_grad()
         data = cell.grad_topo_m
     else:
         data = cell.topo_m
 
-    coeff = get_coeffs(fobj)
+    if orthogonal is None:
+        orthogonal = (not save_coeffs) and (not fobj.grad) and is_orthogonal(fobj)
+
+    if orthogonal:
+        return __do_diag(fobj, data, lmbda, keep_coeffs=keep_coeffs)
+
+    # the blocks of rows of the chunked assembly are planned once per solve
+    plan = plan_chunks(fobj, max_bytes, verbose) if assembly == "chunked" else None
+
+    coeff = __get_basis(fobj, assembly, max_bytes, plan)
 
     if save_coeffs:
-        fobj.coeff = coeff
         return None, None
 
-    # tot_coeff = coeff.shape[1]
+    if solver is None:
+        if assembly == "matfree":
+            solver = "cg"
+        else:
+            solver = "gmres" if iter_solve else "cholesky"
+
+    if assembly == "matfree":
+        assert solver in ["cg", "minres"], (
+            "matrix-free regression requires the cg or minres solver, got %s" % solver
+        )
+
+        h_tilda_l = coeff.rmatvec(data)
+
+        # the regularised normal operator is symmetric positive definite
+        trace = get_normal_diag(fobj).mean() * lmbda
+        E_tilda_lm = LinearOperator(
+            (coeff.shape[1], coeff.shape[1]),
+            matvec=lambda x: coeff.rmatvec(coeff.matvec(x)) + trace * x.ravel(),
+            dtype=float,
+        )
+
+    else:
+        chol_key = (assembly, lmbda)
+        if (solver == "cholesky") and (fobj.chol is not None):
+            reuse_chol = fobj.chol_key == chol_key
+        else:
+            reuse_chol = False
+
+        if (assembly == "chunked") and (not reuse_chol):
+            E_tilda_lm, h_tilda_l = get_normal_chunked(fobj, data, max_bytes, plan)
+        elif assembly == "chunked":
+            h_tilda_l = coeff.rmatvec(data)
+        elif assembly == "fft":
+            h_tilda_l = get_rhs_fft(fobj, data)
+        else:
+            h_tilda_l = np.dot(coeff.T, data.reshape(-1, 1)).flatten()
+
+        if reuse_chol:
+            E_tilda_lm = None
+        else:
+            if assembly != "chunked":
+                E_tilda_lm = __get_normal(fobj, coeff, assembly)
+
+            trace = np.trace(E_tilda_lm) / len(np.diag(E_tilda_lm)) * lmbda
+            szc = E_tilda_lm.shape[0]
+            for ttr in range(szc):
+                E_tilda_lm[ttr, ttr] += trace
+
+    iter_solvers = {"gmres": gmres, "cg": cg, "minres": minres}
+
+    if solver in iter_solvers:
+        if (x0 is not None) and (np.size(x0) != len(h_tilda_l)):
+            x0 = None
+
+        if x0 is not None:
+            # rescale the initial guess to minimise the initial residual, so that it never starts worse than zero
+            ex0 = E_tilda_lm.dot(np.ravel(x0))
+            x0 = (
+                np.ravel(x0)
+                * np.dot(ex0, h_tilda_l)
+                / max(np.dot(ex0, ex0), np.finfo(float).tiny)
+            )
 
-    # E_tilda_lm = np.zeros((tot_coeff,tot_coeff))
+        n_iters = [0]
 
-    h_tilda_l = np.dot(coeff.T, data.reshape(-1, 1)).flatten()
+        def count(*args):
+            n_iters[0] += 1
 
-    E_tilda_lm = np.dot(coeff.T, coeff)
+        kwargs = {"callback_type": "pr_norm"} if solver == "gmres" else {}
+        h_norm = max(np.linalg.norm(h_tilda_l), np.finfo(float).tiny)
 
-    trace = np.trace(E_tilda_lm) / len(np.diag(E_tilda_lm)) * lmbda
-    szc = E_tilda_lm.shape[0]
-    for ttr in range(szc):
-        E_tilda_lm[ttr, ttr] += trace
+        # minres stops on an estimate of the residual that may lie above rtol, so it is restarted from its solution with a tighter tolerance until the true residual meets rtol
+        tol = rtol
+        for _ in range(10):
+            a_m, info = iter_solvers[solver](
+                E_tilda_lm, h_tilda_l, x0=x0, rtol=tol, callback=count, **kwargs
+            )
+            res_norm = np.linalg.norm(E_tilda_lm.dot(a_m) - h_tilda_l) / h_norm
+
+            if (info != 0) or (res_norm <= rtol):
+                break
+
+            x0 = a_m
+            tol *= rtol / res_norm
+
+        fobj.info = info
+        fobj.n_iters = n_iters[0]
+        fobj.res_norm = res_norm
+
+        if info != 0:
+            print(
+                "%s did not converge, info = %i, residual = %.2e"
+                % (solver, info, fobj.res_norm)
+            )
+
+    elif solver == "cholesky":
+        if not reuse_chol:
+            try:
+                fobj.chol = la.cho_factor(E_tilda_lm)
+                fobj.chol_key = chol_key
+            except la.LinAlgError:
+                # E_tilda_lm is not numerically positive definite, e.g., if lmbda = 0.0
+                fobj.chol = None
+
+        if fobj.chol is not None:
+            a_m = la.cho_solve(fobj.chol, h_tilda_l)
+        else:
+            a_m = la.lstsq(E_tilda_lm, h_tilda_l)[0]
 
-    if iter_solve:
-        a_m, _ = gmres(E_tilda_lm, h_tilda_l)
     else:
         a_m = la.inv(E_tilda_lm).dot(h_tilda_l)
 
@@ -94,4 +865,293 @@ def do(fobj, cell, lmbda=0.0, iter_solve=True, save_coeffs=False):
 
     data_recons = coeff.dot(a_m)
 
+    # the factorisation is only reused together with the M matrix
+    if not (keep_coeffs or (solver == "cholesky" and fobj.chol is not None)):
+        fobj.coeff = None
+
     return a_m, data_recons
+
+
+def reg_path(fobj, cell, lmbdas, assembly="dense", select=None, keep_coeffs=False):
+    r"""
+    Solves the linear regression for a range of regularisation parameters from one symmetric eigendecomposition :math:`M^\top M = V \Lambda V^\top`.
+
+    The trace-scaled regularisation in :func:`src.lin_reg.do` shifts the eigenvalues by :math:`\mu = \lambda \, \mathrm{tr}(M^\top M) / n_c`, so that the solution for every :math:`\lambda` is
+
+    .. math:: a_m(\lambda) = V (\Lambda + \mu I)^{-1} V^\top M^\top h,
+
+    and costs :math:`O(n_c^2)` once the eigendecomposition is available.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class.
+    cell : :class:`src.var.topo_cell` instance
+        cell object instance
+    lmbdas : array-like
+        1D array of regularisation parameters
+    assembly : str, optional
+        ``dense`` or ``fft``, see :func:`src.lin_reg.do`. By default 'dense'
+    select : str, optional
+        ``gcv`` selects the regularisation parameter minimising the generalised cross-validation score, ``lcurve`` selects the point of maximum curvature on the L-curve. By default None, i.e., no selection
+    keep_coeffs : bool, optional
+        keeps the ``M`` matrix in ``fobj.coeff``, see :func:`src.lin_reg.do`. By default False
+
+    Returns
+    -------
+    a_ms : array-like
+        2D array of the Fourier amplitudes, one row per regularisation parameter
+    data_recons : array-like
+        2D array of the vector-like topography reconstructed from ``a_ms``, one row per regularisation parameter
+    res_norms : array-like
+        1D array of the residual norms :math:`\| M a_m - h \|_2`
+    lmbda_idx : int or None
+        index of the selected regularisation parameter in ``lmbdas`` if ``select`` is not None
+    """
+    assert assembly in ["dense", "fft"], (
+        "regularisation path requires the dense or fft assembly, got %s" % assembly
+    )
+
+    if fobj.grad:
+        cell.get_grad()
+        data = cell.grad_topo_m
+    else:
+        data = cell.topo_m
+
+    data = data.ravel()
+    lmbdas = np.atleast_1d(lmbdas).astype(float)
+
+    coeff = __get_basis(fobj, assembly)
+
+    if assembly == "fft":
+        h_tilda_l = get_rhs_fft(fobj, data)
+    else:
+        h_tilda_l = np.dot(coeff.T, data)
+    E_tilda_lm = __get_normal(fobj, coeff, assembly)
+
+    eigvals, eigvecs = la.eigh(E_tilda_lm)
+    eigvals = np.maximum(eigvals, 0.0)
+    del E_tilda_lm
+
+    # trace-scaled shifts of the eigenvalues, one row per lmbda
+    shifts = lmbdas.reshape(-1, 1) * eigvals.sum() / len(eigvals)
+    denom = eigvals.reshape(1, -1) + shifts
+
+    proj = np.dot(eigvecs.T, h_tilda_l)
+    coeffs = proj.reshape(1, -1) / denom
+
+    a_ms = np.dot(coeffs, eigvecs.T)
+    data_recons = np.dot(a_ms, coeff.T)
+
+    if not keep_coeffs:
+        fobj.coeff = None
+
+    # || M a - h ||^2 = h.h - 2 a.M^T h + a.M^T M a, evaluated in the eigenbasis
+    res_sq = np.dot(data, data) - (
+        proj**2 * (eigvals.reshape(1, -1) + 2.0 * shifts) / denom**2
+    ).sum(axis=1)
+    res_norms = np.sqrt(np.maximum(res_sq, 0.0))
+
+    if select == "gcv":
+        dofs = (eigvals.reshape(1, -1) / denom).sum(axis=1)
+        scores = len(data) * res_norms**2 / (len(data) - dofs) ** 2
+        lmbda_idx = int(np.argmin(scores))
+
+    elif select == "lcurve":
+        sol_norms = np.sqrt((coeffs**2).sum(axis=1))
+
+        xx = np.log(res_norms)
+        yy = np.log(sol_norms)
+        tt = np.log(lmbdas)
+
+        dx, dy = np.gradient(xx, tt), np.gradient(yy, tt)
+        ddx, ddy = np.gradient(dx, tt), np.gradient(dy, tt)
+
+        curvature = (dx * ddy - ddx * dy) / (dx**2 + dy**2) ** (3 / 2)
+        curvature[~np.isfinite(curvature)] = -np.inf
+        lmbda_idx = int(np.argmax(curvature))
+
+    else:
+        lmbda_idx = None
+
+    return a_ms, data_recons, res_norms, lmbda_idx
+
+
+def do_batch(fobjs, cells, lmbda=0.0, assembly="dense"):
+    """
+    Does the linear regression for several cells at once.
+
+    The regularised normal matrices are bucketed by their size and each bucket is solved with a single batched call to :func:`numpy.linalg.solve`, instead of one small solve per cell. Cells with a diagonal :math:`M^\top M`, see :func:`src.lin_reg.is_orthogonal`, are solved by an elementwise division as in :func:`src.lin_reg.do` and skip the batch.
+
+    Parameters
+    ----------
+    fobjs : list
+        list of :class:`src.fourier.f_trans` instances, one per cell, initialised with :func:`src.fourier.f_trans.do_full`. :func:`src.fourier.f_trans.do_modes` suffices for the cells with a diagonal :math:`M^\top M`
+    cells : list
+        list of :class:`src.var.topo_cell` instances
+    lmbda : float, optional
+        regularisation parameter, by default 0.0
+    assembly : str, optional
+        ``dense`` or ``fft``, see :func:`src.lin_reg.do`. By default 'dense'
+
+    Returns
+    -------
+    list
+        list of tuples ``(a_m, data_recons)``, one per cell, see :func:`src.lin_reg.do`
+    """
+    assert assembly in ["dense", "fft"], (
+        "batched regression requires the dense or fft assembly, got %s" % assembly
+    )
+    assert len(fobjs) == len(cells)
+
+    E_tilda_lms = {}
+    h_tilda_ls = {}
+    buckets = {}
+    results = [None] * len(fobjs)
+
+    for cnt, (fobj, cell) in enumerate(zip(fobjs, cells)):
+        if fobj.grad:
+            cell.get_grad()
+            data = cell.grad_topo_m
+        else:
+            data = cell.topo_m
+
+        if (not fobj.grad) and is_orthogonal(fobj):
+            results[cnt] = __do_diag(fobj, data, lmbda)
+            continue
+
+        coeff = __get_basis(fobj, assembly)
+
+        if assembly == "fft":
+            h_tilda_l = get_rhs_fft(fobj, data)
+        else:
+            h_tilda_l = np.dot(coeff.T, data.reshape(-1, 1)).flatten()
+        E_tilda_lm = __get_normal(fobj, coeff, assembly)
+
+        trace = np.trace(E_tilda_lm) / len(np.diag(E_tilda_lm)) * lmbda
+        E_tilda_lm[np.diag_indices_from(E_tilda_lm)] += trace
+
+        E_tilda_lms[cnt] = E_tilda_lm
+        h_tilda_ls[cnt] = h_tilda_l
+        buckets.setdefault(len(h_tilda_l), []).append(cnt)
+
+    for idxs in buckets.values():
+        E_stack = np.stack([E_tilda_lms[idx] for idx in idxs])
+        h_stack = np.stack([h_tilda_ls[idx] for idx in idxs])
+
+        sols = np.linalg.solve(E_stack, h_stack[..., np.newaxis])[..., 0]
+
+        for idx, sol in zip(idxs, sols):
+            results[idx] = (sol, fobjs[idx].coeff.dot(sol))
+            fobjs[idx].coeff = None
+
+    return results
+
+
+def omp(fobj, cell, n_modes, tol=0.0):
+    r"""
+    Greedy selection of the spectral modes by orthogonal matching pursuit.
+
+    In each step, the :math:`(k,l)`-pair whose cosine and sine terms correlate most with the current residual is added, the Cholesky factor of :math:`M_s^\top M_s` of the selected columns :math:`M_s` is extended by one row per added column, and the residual of the least-squares fit on the selected columns is updated. The correlations :math:`M^\top r` are computed with :func:`src.lin_reg.get_rhs_fft`, and each step costs :math:`O(N \log N + N k + k^2)` for ``k`` selected columns.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans` instance
+        instance of the Fourier transformer class spanning the candidate modes, initialised with :func:`src.fourier.f_trans.do_modes` without selected ``(k,l)``-pairs.
+    cell : :class:`src.var.topo_cell` instance
+        cell object instance
+    n_modes : int
+        maximum number of selected ``(k,l)``-pairs
+    tol : float, optional
+        stops the selection if the squared residual norm decreases by less than ``tol`` times the squared norm of the data in a step, by default 0.0, i.e., ``n_modes`` pairs are selected
+
+    Returns
+    -------
+    k_idxs : array-like
+        indices of the selected pairs in ``fobj.m_i``
+    l_idxs : array-like
+        indices of the selected pairs in ``fobj.m_j``
+    res_norms : array-like
+        residual norm :math:`\| M_s a - h \|_2` after each step
+    """
+    assert not fobj.pick_kls, "the candidate modes must span the full spectral space"
+
+    data = cell.topo_m.ravel()
+    ncos = len(fobj.k_cos)
+    n_modes = min(n_modes, ncos)
+
+    diag = get_normal_diag(fobj)
+    diag[diag <= 0.0] = np.inf
+
+    # the sine term of each cosine term, if any
+    kls_sin = zip(np.rint(fobj.k_sin).astype(int), np.rint(fobj.l_sin).astype(int))
+    sin_idx = {kl: ncos + idx for idx, kl in enumerate(kls_sin)}
+    kls_cos = zip(np.rint(fobj.k_cos).astype(int), np.rint(fobj.l_cos).astype(int))
+    pairs = [sin_idx.get(kl, -1) for kl in kls_cos]
+    pairs = np.array(pairs)
+    has_sin = pairs >= 0
+
+    kks = np.concatenate((fobj.k_cos, fobj.k_sin))
+    lls = np.concatenate((fobj.l_cos, fobj.l_sin))
+
+    cols = np.zeros((len(data), 2 * n_modes))
+    chol = np.zeros((2 * n_modes, 2 * n_modes))
+    h_sel = np.zeros(2 * n_modes)
+    ncols = 0
+
+    selected = np.zeros(ncos, dtype=bool)
+    res = np.copy(data)
+    data_sq = max(np.dot(data, data), np.finfo(float).tiny)
+    res_sq = np.dot(data, data)
+    res_norms = []
+
+    for _ in range(n_modes):
+        corr = get_rhs_fft(fobj, res)
+
+        score = corr[:ncos] ** 2 / diag[:ncos]
+        score[has_sin] += corr[pairs[has_sin]] ** 2 / diag[pairs[has_sin]]
+        score[selected] = -np.inf
+
+        pick = int(np.argmax(score))
+        selected[pick] = True
+
+        theta = (
+            2.0 * np.pi * (kks[pick] * fobj.I / fobj.Ni + lls[pick] * fobj.J / fobj.Nj)
+        )
+        new_cols = [np.cos(theta)]
+        if has_sin[pick]:
+            new_cols.append(np.sin(theta))
+
+        for col in new_cols:
+            # rank-one extension of the Cholesky factor, skipping linearly dependent columns
+            col_sq = np.dot(col, col)
+            ww = la.solve_triangular(
+                chol[:ncols, :ncols], np.dot(cols[:, :ncols].T, col), lower=True
+            )
+            dd = col_sq - np.dot(ww, ww)
+
+            if dd <= 1e-10 * col_sq:
+                continue
+
+            cols[:, ncols] = col
+            chol[ncols, :ncols] = ww
+            chol[ncols, ncols] = np.sqrt(dd)
+            h_sel[ncols] = np.dot(col, data)
+            ncols += 1
+
+        zz = la.solve_triangular(chol[:ncols, :ncols], h_sel[:ncols], lower=True)
+        a_m = la.solve_triangular(chol[:ncols, :ncols].T, zz, lower=False)
+        res = data - np.dot(cols[:, :ncols], a_m)
+
+        res_sq_prev = res_sq
+        res_sq = max(np.dot(data, data) - np.dot(zz, zz), 0.0)
+        res_norms.append(np.sqrt(res_sq))
+
+        if (res_sq_prev - res_sq) < tol * data_sq:
+            break
+
+    picks = np.nonzero(selected)[0]
+    k_idxs = np.searchsorted(fobj.m_i, np.rint(fobj.k_cos[picks]))
+    l_idxs = np.searchsorted(fobj.m_j, np.rint(fobj.l_cos[picks]))
+
+    return k_idxs, l_idxs, np.array(res_norms)
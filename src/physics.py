@@ -1,9 +1,10 @@
 import numpy as np
+import numba as nb
 
 
 class ideal_pmf(object):
     """
-    Helper class to compute the idealised pseudo-momentum fluxes under one setting.
+    Helper class to compute the idealised pseudo-momentum fluxes under one setting, or under several background wind settings with :func:`src.physics.ideal_pmf.compute_uw_pmf_winds`.
     """
 
     def __init__(self, **kwarg):
@@ -25,7 +26,7 @@ class ideal_pmf(object):
         for key, value in kwarg.items():
             setattr(self, key, value)
 
-    def compute_uw_pmf(self, analysis, summed=True):
+    def compute_uw_pmf(self, analysis, summed=True, out=None):
         """
         Computation method
 
@@ -35,61 +36,144 @@ class ideal_pmf(object):
             instance of the `analysis` class.
         summed : bool, optional
             by default True, i.e., returns a sum of the spectrum. Other, return a 2D-like array of the spectrum.
+        out : array-like, optional
+            buffer of the shape of ``analysis.ampls`` the spectrum is written into, by default None, i.e., a new array is allocated
 
         Returns
         -------
         array-like or float
             depends on the value of ``summed``
         """
-        N = self.N
-        U = self.U
-        V = self.V
+        if out is not None:
+            out = out[np.newaxis]
+
+        uw_pmf = self.compute_uw_pmf_winds(
+            analysis, U=self.U, V=self.V, N=self.N, summed=summed, out=out
+        )
+
+        return uw_pmf[0]
+
+    def compute_uw_pmf_winds(
+        self, analysis, U=None, V=None, N=None, summed=True, out=None
+    ):
+        """
+        Vectorised computation method for several background wind settings at once
+
+        The wavenumber terms do not depend on the background wind and are shared across the wind settings.
+
+        Parameters
+        ----------
+        analysis : :class:`src.var.analysis`
+            instance of the `analysis` class.
+        U : array-like or float, optional
+            background wind in the first horizontal direction, by default ``self.U``
+        V : array-like or float, optional
+            background wind in the second horizontal direction, by default ``self.V``
+        N : array-like or float, optional
+            Brunt-Väisälä frequency, by default ``self.N``
+        summed : bool, optional
+            by default True, i.e., returns a sum of the spectrum for each wind setting. Otherwise, returns the spectra.
+        out : array-like, optional
+            buffer of shape ``(n_winds,) + analysis.ampls.shape`` the spectra are written into, by default None, i.e., a new array is allocated
+
+        Returns
+        -------
+        array-like
+            ``U``, ``V`` and ``N`` are broadcast against each other to the leading wind axis of size ``n_winds``. The shape of the output is ``(n_winds,)`` if ``summed``, otherwise ``(n_winds,) + analysis.ampls.shape``.
+        """
+        U = self.U if U is None else U
+        V = self.V if V is None else V
+        N = self.N if N is None else N
+
+        U, V, N = np.broadcast_arrays(
+            np.atleast_1d(U).astype(float),
+            np.atleast_1d(V).astype(float),
+            np.atleast_1d(N).astype(float),
+        )
+        assert U.ndim == 1, "U, V and N must be scalars or 1D arrays"
 
         wlat = analysis.wlat
         wlon = analysis.wlon
 
-        kks = analysis.kks * 2.0 * np.pi
-        lls = analysis.lls * 2.0 * np.pi
+        wla = wlat  # * self.AE
+        wlo = wlon  # * self.AE
+
+        # wind-independent terms
+        kks = analysis.kks * 2.0 * np.pi / wlo
+        lls = analysis.lls * 2.0 * np.pi / wla
 
         # if ((kks.ndim == 1) and (lls.ndim == 1)):
         #     print(True)
         #     ampls = analysis.ampls[np.nonzero(analysis.ampls)]
         # else:
         #     ampls = analysis.ampls
-        ampls = np.copy(analysis.ampls)
+        ampls = analysis.ampls
 
-        wla = wlat  # * self.AE
-        wlo = wlon  # * self.AE
+        # the wind settings run along the leading axis
+        shp = (-1,) + (1,) * max(np.ndim(kks), np.ndim(lls), np.ndim(ampls))
+        U = U.reshape(shp)
+        V = V.reshape(shp)
+        N = N.reshape(shp)
+
+        uw_pmf = self.__uw_pmf(ampls, kks, lls, U, V, N, out=out)
+
+        if summed:
+            return uw_pmf.reshape(len(U), -1).sum(axis=1)
+        else:
+            return uw_pmf
+
+    @staticmethod
+    @nb.vectorize(
+        [
+            "float64(float64, float64, float64, float64, float64, float64)",
+            "complex128(complex128, float64, float64, float64, float64, float64)",
+        ],
+        cache=True,
+    )
+    def __uw_pmf(ampl, kk, ll, U, V, N):
+        """Fused kernel computing the idealised pseudo-momentum flux of one spectral mode under one background wind setting without any temporary arrays
+
+        Parameters
+        ----------
+        ampl : float or complex
+            spectral amplitude. Complex amplitudes are squared without taking the modulus, as in the array implementation this kernel replaces
+        kk : float
+            wavenumber in the first horizontal direction [m^{-1}]
+        ll : float
+            wavenumber in the second horizontal direction [m^{-1}]
+        U : float
+            background wind in the first horizontal direction
+        V : float
+            background wind in the second horizontal direction
+        N : float
+            Brunt-Väisälä frequency
 
-        kks = kks / wlo
-        lls = lls / wla
+        Returns
+        -------
+        float or complex
+            pseudo-momentum flux of the type of ``ampl``, zero for singular modes and modes with non-finite wave-action density
+        """
+        kls_sq = kk**2 + ll**2
 
-        om = -kks * U - lls * V
+        om = -kk * U - ll * V
         omsq = om**2
 
-        mms = (N**2 * (kks**2 + lls**2) / omsq) - (kks**2 + lls**2)
-        # ampls[np.where(mms <= 0.0)] = 0.0
-        mms[np.isnan(mms)] = 0.0
+        mms = (N**2 * kls_sq / omsq) - kls_sq
+        if np.isnan(mms):
+            mms = 0.0
+        # evanescent modes, i.e., mms < 0, give NaN
         mms = np.sqrt(mms)
 
         # wave-action density
-        Ag = -0.5 * ((ampls) ** 2 * N**2 / om)
-        Ag[np.isinf(Ag)] = 0.0
-        Ag[np.isnan(Ag)] = 0.0
+        # a real divisor avoids the ZeroDivisionError of the complex division for om = 0
+        Ag = -0.5 * (ampl) ** 2 * (N**2 / om)
+        if np.isinf(Ag) or np.isnan(Ag):
+            Ag = 0.0
 
         # group velocity in z-direction
-        cgz = (
-            self.N
-            * (kks**2 + lls**2) ** 0.5
-            * mms
-            / (kks**2 + lls**2 + mms**2) ** (3 / 2)
-        )
+        cgz_den = kls_sq + mms**2
+        cgz = N * np.sqrt(kls_sq) * mms / (cgz_den * np.sqrt(cgz_den))
+        if np.isnan(cgz):
+            cgz = 0.0
 
-        cgz[np.isnan(cgz)] = 0.0
-
-        uw_pmf = Ag * kks * cgz
-
-        if summed:
-            return uw_pmf.sum()
-        else:
-            return uw_pmf
+        return Ag * kk * cgz
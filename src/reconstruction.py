@@ -17,14 +17,87 @@ def recon_2D(recons_z, cell):
     array-like
         2D reconstructed topography, values outside the mask are set to zero.
     """
-    lon, lat = cell.lon, cell.lat
-
     recons_z_2D = np.zeros(np.shape(cell.topo))
-    c = 0
-    for i in range(len(lat)):
-        for j in range(len(lon)):
-            if cell.mask[i, j] == 1:
-                recons_z_2D[i, j] = recons_z[c]
-                c = c + 1
+
+    # the masked data points are ordered row by row
+    recons_z_2D[cell.mask == 1] = np.asarray(recons_z).ravel()
 
     return recons_z_2D
+
+
+def synthesise(fobj, a_m, shape=None, upsample=1, engine="fft"):
+    r"""
+    Evaluates the Fourier series given by the amplitudes ``a_m`` on a rectangular grid, i.e., the topography
+
+    .. math:: h(I, J) = \sum_{k,l} a_{k,l}^{\cos} \cos(2 \pi (k I / N_i + l J / N_j)) + a_{k,l}^{\sin} \sin(2 \pi (k I / N_i + l J / N_j))
+
+    without assembling the ``M`` matrix of the linear regression.
+
+    Parameters
+    ----------
+    fobj : :class:`src.fourier.f_trans`
+        instance of the Fourier transformer with the grid indices and the wavenumbers initialised, i.e., after :func:`src.fourier.f_trans.do_full` or :func:`src.fourier.f_trans.do_modes`
+    a_m : array-like
+        Fourier amplitudes computed by :func:`src.lin_reg.do`
+    shape : tuple, optional
+        ``(nj, ni)`` shape of the target grid, by default None, i.e., the bounding box of the data points of ``fobj`` at the resolution given by ``upsample``
+    upsample : int, optional
+        the target grid has ``upsample`` points per grid spacing of the data points, by default 1
+    engine : str, optional
+        ``fft`` evaluates the series by an inverse FFT, ``direct`` by multiplying 1D tables of complex exponentials in each horizontal direction. By default 'fft'
+
+    Returns
+    -------
+    array-like
+        2D topography, where the entry ``[j, i]`` corresponds to the grid indices :math:`J = j / \text{upsample}` and :math:`I = i / \text{upsample}` of ``fobj``, see :func:`src.fourier.f_trans.do_full`
+
+    .. note:: The data points of the linear regression lie on the grid with ``upsample = 1``, so that ``synthesise(fobj, a_m)[fobj.J, fobj.I]`` recovers the reconstruction :math:`M a_m`.
+    """
+    assert int(upsample) == upsample and upsample >= 1
+
+    a_m = np.asarray(a_m).ravel()
+    ncos = len(fobj.k_cos)
+
+    kks = np.concatenate((fobj.k_cos, fobj.k_sin))
+    lls = np.concatenate((fobj.l_cos, fobj.l_sin))
+
+    # a_cos cos(theta) + a_sin sin(theta) = Re((a_cos - i a_sin) exp(i theta))
+    ampls = np.concatenate((a_m[:ncos], -1.0j * a_m[ncos:]))
+
+    if shape is None:
+        shape = (
+            fobj.J.max() * upsample + 1,
+            fobj.I.max() * upsample + 1,
+        )
+
+    if engine == "fft":
+        # the series is periodic over (upsample * Nj, upsample * Ni) points of the target grid
+        Pj, Pi = int(upsample * fobj.Nj), int(upsample * fobj.Ni)
+
+        spec = np.zeros((Pj, Pi), dtype=complex)
+        np.add.at(
+            spec,
+            (lls.astype(int) % Pj, kks.astype(int) % Pi),
+            ampls,
+        )
+        period = np.fft.ifft2(spec).real * (Pj * Pi)
+
+        return period[np.ix_(np.arange(shape[0]) % Pj, np.arange(shape[1]) % Pi)]
+
+    elif engine == "direct":
+        k_uniq, k_inv = np.unique(kks, return_inverse=True)
+        l_uniq, l_inv = np.unique(lls, return_inverse=True)
+
+        spec = np.zeros((len(l_uniq), len(k_uniq)), dtype=complex)
+        np.add.at(spec, (l_inv, k_inv), ampls)
+
+        idx_j = np.arange(shape[0]).reshape(-1, 1) / upsample
+        idx_i = np.arange(shape[1]).reshape(-1, 1) / upsample
+
+        phs_j = np.exp(2.0j * np.pi * idx_j * l_uniq.reshape(1, -1) / fobj.Nj)
+        phs_i = np.exp(2.0j * np.pi * idx_i * k_uniq.reshape(1, -1) / fobj.Ni)
+
+        return (phs_j @ spec @ phs_i.T).real
+
+    else:
+        assert 0, "engine %s is not supported" % engine
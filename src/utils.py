@@ -5,8 +5,9 @@ This module contains miscellaneous helper functions and classes
 import numpy as np
 import numba as nb
 import scipy.signal as signal
-import scipy.interpolate as interpolate
+import scipy.ndimage as ndimage
 import sys
+from collections import OrderedDict
 
 
 def pick_cell(
@@ -229,6 +230,111 @@ def gen_art_terrain(
     return k
 
 
+@nb.njit(cache=True)
+def is_inside_sm(point, polygon):
+    """Defines function that computes whether a point is in a polygon, and rescales the lat-lon grid to a local coordinate between [0,1].
+
+    Parameters
+    ----------
+    point : tuple
+        ``(float, float)``, coordinates of the data point
+    polygon : tuple
+        ``((x1,y1),(x2,y2),(x3,y3))`` describing the triangle's vertices
+
+    Returns
+    -------
+    bool
+        returs True if ``point`` is in ``polygon``, False otherwise
+
+    .. note::
+
+        Taken from: https://github.com/sasamil/PointInPolygon_Py/blob/master/pointInside.py
+    """
+
+    length = len(polygon) - 1
+    dy2 = point[1] - polygon[0][1]
+    intersections = 0
+    ii = 0
+    jj = 1
+
+    while ii < length:
+        dy = dy2
+        dy2 = point[1] - polygon[jj][1]
+
+        # consider only lines which are not completely above/bellow/right from the point
+        if dy * dy2 <= 0.0 and (
+            point[0] >= polygon[ii][0] or point[0] >= polygon[jj][0]
+        ):
+            # non-horizontal line
+            if dy < 0 or dy2 < 0:
+                F = dy * (polygon[jj][0] - polygon[ii][0]) / (dy - dy2) + polygon[ii][0]
+
+                if (
+                    point[0] > F
+                ):  # if line is left from the point - the ray moving towards left, will intersect it
+                    intersections += 1
+                elif point[0] == F:  # point on line
+                    return 1
+
+            # point on upper peak (dy2=dx2=0) or horizontal line (dy=dy2=0 and dx*dx2<=0)
+            elif dy2 == 0 and (
+                point[0] == polygon[jj][0]
+                or (
+                    dy == 0
+                    and (point[0] - polygon[ii][0]) * (point[0] - polygon[jj][0]) <= 0
+                )
+            ):
+                return 1
+
+        ii = jj
+        jj += 1
+
+    # print 'intersections =', intersections
+    return intersections & 1
+
+
+@nb.njit(parallel=True, cache=True)
+def rasterise(xs, ys, polygons):
+    """Computes the masks of several polygons on a rectilinear grid in one parallel pass, using the point-in-polygon test of :func:`src.utils.is_inside_sm` for each grid point
+
+    Parameters
+    ----------
+    xs : array-like
+        1D coordinates of the grid in the first horizontal direction, rescaled as the vertices, see :func:`src.utils.rescale`
+    ys : array-like
+        1D coordinates of the grid in the second horizontal direction, rescaled as the vertices
+    polygons : array-like
+        ``(n_polygons, n_vertices + 1, 2)`` array of closed polygons, e.g., the ``polygon`` attribute of :class:`src.utils.gen_triangle` instances
+
+    Returns
+    -------
+    array-like
+        ``(n_polygons, len(ys), len(xs))`` Boolean array, True for the grid points inside or on the boundary of each polygon
+    """
+    n_poly = polygons.shape[0]
+    ny, nx = len(ys), len(xs)
+    mask = np.zeros((n_poly, ny, nx), dtype=np.bool_)
+
+    for row in nb.prange(n_poly * ny):
+        pp = row // ny
+        ii = row % ny
+        polygon = polygons[pp]
+
+        # grid points outside of the bounding box of the polygon are skipped
+        if ys[ii] < polygon[:, 1].min() or ys[ii] > polygon[:, 1].max():
+            continue
+
+        x_min = polygon[:, 0].min()
+        x_max = polygon[:, 0].max()
+
+        for jj in range(nx):
+            if xs[jj] < x_min or xs[jj] > x_max:
+                continue
+            mask[pp, ii, jj] = is_inside_sm((xs[jj], ys[ii]), polygon) == 1
+
+    return mask
+
+
 class gen_triangle(object):
     """
     Defines a triangle generator given the coordinates of its vertices
@@ -261,6 +367,7 @@ class gen_triangle(object):
         vy = rescale(vy, rng=y_rng)
 
         polygon = np.array([list(item) for item in zip(vx, vy)])
+        self.polygon = polygon
 
         # self.vec_get_mask = np.vectorize(self.get_mask)
         self.vec_get_mask = self.__mask_wrapper(polygon)
@@ -289,74 +396,28 @@ class gen_triangle(object):
     #     return [x2-x1, y2-y1]
 
     def __mask_wrapper(self, polygon):
-        return lambda p: self.__is_inside_sm(p, polygon)
+        return lambda p: is_inside_sm(p, polygon)
 
-    @staticmethod
-    @nb.njit(cache=True)
-    def __is_inside_sm(point, polygon):
-        """Defines function that computes whether a point is in a polygon, and rescales the lat-lon grid to a local coordinate between [0,1].
+    def get_mask(self, xs, ys):
+        """Computes the mask of the triangle on a rectilinear grid, see :func:`src.utils.rasterise`
 
         Parameters
         ----------
-        point : tuple
-            ``(float, float)``, coordinates of the data point
-        polygon : tuple
-            ``((x1,y1),(x2,y2),(x3,y3))`` describing the triangle's vertices
+        xs : array-like
+            1D coordinates of the grid in the first horizontal direction, rescaled as the vertices
+        ys : array-like
+            1D coordinates of the grid in the second horizontal direction, rescaled as the vertices
 
         Returns
         -------
-        bool
-            returs True if ``point`` is in ``polygon``, False otherwise
-
-        .. note::
-
-            Taken from: https://github.com/sasamil/PointInPolygon_Py/blob/master/pointInside.py
+        array-like
+            ``(len(ys), len(xs))`` Boolean mask
         """
-
-        length = len(polygon) - 1
-        dy2 = point[1] - polygon[0][1]
-        intersections = 0
-        ii = 0
-        jj = 1
-
-        while ii < length:
-            dy = dy2
-            dy2 = point[1] - polygon[jj][1]
-
-            # consider only lines which are not completely above/bellow/right from the point
-            if dy * dy2 <= 0.0 and (
-                point[0] >= polygon[ii][0] or point[0] >= polygon[jj][0]
-            ):
-                # non-horizontal line
-                if dy < 0 or dy2 < 0:
-                    F = (
-                        dy * (polygon[jj][0] - polygon[ii][0]) / (dy - dy2)
-                        + polygon[ii][0]
-                    )
-
-                    if (
-                        point[0] > F
-                    ):  # if line is left from the point - the ray moving towards left, will intersect it
-                        intersections += 1
-                    elif point[0] == F:  # point on line
-                        return 1
-
-                # point on upper peak (dy2=dx2=0) or horizontal line (dy=dy2=0 and dx*dx2<=0)
-                elif dy2 == 0 and (
-                    point[0] == polygon[jj][0]
-                    or (
-                        dy == 0
-                        and (point[0] - polygon[ii][0]) * (point[0] - polygon[jj][0])
-                        <= 0
-                    )
-                ):
-                    return 1
-
-            ii = jj
-            jj += 1
-
-        # print 'intersections =', intersections
-        return intersections & 1
+        return rasterise(
+            np.asarray(xs, dtype=float),
+            np.asarray(ys, dtype=float),
+            self.polygon[np.newaxis],
+        )[0]
 
 
 def rescale(arr, rng=None):
@@ -374,7 +435,7 @@ def rescale(arr, rng=None):
     list
         ``arr`` values rescaled to [0,1]
 
-    .. note:: This rescaling is required to work with the fast :func:`triangle generator function <src.utils.gen_triangle.is_inside_sm>`.
+    .. note:: This rescaling is required to work with the fast :func:`triangle generator function <src.utils.is_inside_sm>`.
 
     """
     if rng is None:
@@ -415,6 +476,185 @@ def get_size(obj, seen=None):
     return size
 
 
+class lru_cache(object):
+    """
+    Content-addressed least-recently-used cache of arrays with a byte budget
+
+    Each entry is addressed by a hashable ``key`` and holds named items, e.g., the spectrum of the sampling mask of a given cell geometry. Entries are evicted in least-recently-used order once the total size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=2**30):
+        """
+        Parameters
+        ----------
+        max_bytes : int, optional
+            byte budget of the cache, by default 2**30, i.e., 1 GiB
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, name):
+        """Gets item ``name`` of entry ``key``
+
+        Parameters
+        ----------
+        key : hashable
+            address of the entry
+        name : str
+            name of the item
+
+        Returns
+        -------
+        any
+            the cached item, None if it is not in the cache
+        """
+        if (key in self.entries) and (name in self.entries[key]):
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][name]
+        else:
+            self.misses += 1
+            return None
+
+    def put(self, key, name, value):
+        """Puts ``value`` as item ``name`` of entry ``key``, and evicts the least-recently-used entries if the byte budget is exceeded
+
+        Parameters
+        ----------
+        key : hashable
+            address of the entry
+        name : str
+            name of the item
+        value : any
+            array, or tuple of arrays, to be cached
+        """
+        size = self.__get_nbytes(value)
+
+        if size > self.max_bytes:
+            return
+
+        entry = self.entries.setdefault(key, {})
+        if name in entry:
+            self.nbytes -= self.__get_nbytes(entry[name])
+
+        entry[name] = value
+        self.nbytes += size
+        self.entries.move_to_end(key)
+
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= sum([self.__get_nbytes(item) for item in evicted.values()])
+
+    @staticmethod
+    def __get_nbytes(value):
+        if isinstance(value, tuple):
+            return sum([getattr(item, "nbytes", 0) for item in value])
+        else:
+            return getattr(value, "nbytes", 0)
+
+
+# index maps of the nearest-neighbour remapping in get_lat_lon_segments
+__regrid_maps = lru_cache(max_bytes=2**26)
+
+
+def filter_cell(cell, scale=5000.0):
+    """
+    Removes topographic features smaller than ``scale`` from the topography of a grid cell with a Gaussian low-pass filter in spectral space. The filtered topography is demeaned.
+
+    Parameters
+    ----------
+    cell : :class:`src.var.topo_cell`
+        instance of the cell object class, with the topography on an equidistant grid of spacings ``cell.wlat`` and ``cell.wlon`` in meters
+    scale : float, optional
+        cut-off scale in meters, by default 5000.0. See :func:`src.utils.filter_topo` for the domain-wide equivalent
+    """
+    ampls = np.fft.fft2(cell.topo)
+    ampls /= ampls.size
+    wlat = cell.wlat
+    wlon = cell.wlon
+
+    kks = np.fft.fftfreq(cell.topo.shape[1])
+    lls = np.fft.fftfreq(cell.topo.shape[0])
+
+    kkg, llg = np.meshgrid(kks, lls)
+
+    kls = ((2.0 * np.pi * kkg / wlon) ** 2 + (2.0 * np.pi * llg / wlat) ** 2) ** 0.5
+
+    ampls *= np.exp(-((kls / (2.0 * np.pi / scale)) ** 2.0))
+
+    cell.topo = np.fft.ifft2(ampls * ampls.size).real
+    cell.topo -= cell.topo.mean()
+
+
+def filter_topo(topo, scale=5000.0, band_tol=1e-2, truncate=4.0):
+    r"""
+    Removes topographic features smaller than ``scale`` from the whole domain at once and stores the result in ``topo.topo_filtered`` and ``scale`` in ``topo.filter_scale``, which is then sliced by :func:`src.utils.get_lat_lon_segments` instead of filtering each grid cell separately.
+
+    The spectral filter :math:`\exp(-(k / k_c)^2)` with :math:`k_c = 2 \pi / \text{scale}` corresponds to a Gaussian kernel with the standard deviation :math:`\sqrt{2} / k_c` in physical space. The kernel is separable and is applied in the latitudinal and then in the longitudinal direction. The longitudinal grid spacing in meters shrinks with latitude, so the kernel width is corrected per latitude band.
+
+    Parameters
+    ----------
+    topo : :class:`src.var.topo`
+        instance of the topography object class
+    scale : float, optional
+        cut-off scale in meters, by default 5000.0
+    band_tol : float, optional
+        relative variation of the longitudinal kernel width allowed within a latitude band, by default 1e-2
+    truncate : float, optional
+        the kernel is truncated at this many standard deviations, by default 4.0
+
+    Returns
+    -------
+    array-like
+        the filtered topography ``topo.topo_filtered``, or None if the kernel is narrower than the grid spacing in either direction. The truncated kernel is then a poor approximation of the spectral filter, and the grid cells fall back to the filter in :func:`src.utils.filter_cell`.
+    """
+    lat = np.asarray(topo.lat)
+    lon = np.asarray(topo.lon)
+    assert lat.ndim == 1 and lon.ndim == 1
+
+    # the per-cell fallback uses the same scale
+    topo.filter_scale = scale
+
+    sigma = np.sqrt(2.0) * scale / (2.0 * np.pi)
+
+    # the latitudinal grid spacing in meters is the same everywhere
+    wlat = np.diff(latlon2m(lat, lon[0], latlon="lat")).mean()
+
+    dlon = (lon[-1] - lon[0]) / (lon.size - 1)
+    wlon = __latlon2m_converter(lon[0], lon[0] + dlon, lat, lat) * 1000
+    sigma_lon = sigma / wlon
+
+    # a kernel narrower than the grid spacing is a poor approximation of the spectral filter
+    if min(sigma / wlat, sigma_lon.min()) < 1.0:
+        print(
+            "filter_topo: kernel width %.0fm is below the grid spacing, falling back to the per-cell filter"
+            % sigma
+        )
+        topo.topo_filtered = None
+        return None
+
+    filtered = ndimage.gaussian_filter1d(
+        np.asarray(topo.topo, dtype=float), sigma / wlat, axis=0, truncate=truncate
+    )
+
+    # group the rows into latitude bands with nearly the same kernel width
+    bands = np.round(np.log(sigma_lon) / np.log1p(band_tol)).astype(int)
+
+    for band in np.unique(bands):
+        rows = bands == band
+        filtered[rows] = ndimage.gaussian_filter1d(
+            filtered[rows], sigma_lon[rows].mean(), axis=1, truncate=truncate
+        )
+
+    topo.topo_filtered = filtered
+
+    return filtered
+
+
 def get_lat_lon_segments(
     lat_verts,
     lon_verts,
@@ -426,6 +666,8 @@ def get_lat_lon_segments(
     topo_mask=None,
     mask=None,
     load_topo=False,
+    labels=None,
+    simplex_idx=None,
 ):
     """
     Populates an empty :class:`cell <src.var.topo_cell>` object given the vertices and underlying topography.
@@ -443,7 +685,7 @@ def get_lat_lon_segments(
     rect : bool, optional
         do the vertices describe a quadrilateral grid cell? By default False
     filtered : bool, optional
-        removes topographic features smaller than 5km in scale, by default True
+        removes topographic features smaller than ``topo.filter_scale``, i.e., 5km by default, see :func:`src.utils.filter_cell`. By default True. If the domain-wide ``topo.topo_filtered`` is available, see :func:`src.utils.filter_topo`, the filtered topography is sliced from it instead
     padding : int, optional
         number of data points in the padded region, by default 0
     topo_mask : array-like, optional
@@ -452,6 +694,10 @@ def get_lat_lon_segments(
         2D Boolean mask to select for data points inside the non-quadrilateral grid cell, by default None
     load_topo : bool, optional
         explicitly replaces the topography attribute in the cell ``cell.topo`` with the data given in ``topo``, by default False
+    labels : array-like, optional
+        2D ownership raster of the data points in ``topo``, see :func:`src.delaunay.get_labels`. If given together with ``simplex_idx``, the mask of the non-quadrilateral grid cell is sliced from the raster instead of being rasterised, by default None
+    simplex_idx : int, optional
+        index of the simplex described by the vertices, by default None
     """
     lat_max = get_closest_idx(lat_verts.max(), topo.lat) + padding
     lat_min = get_closest_idx(lat_verts.min(), topo.lat) - padding
@@ -465,54 +711,46 @@ def get_lat_lon_segments(
     lon_origin = cell.lon[0]
     lat_origin = cell.lat[0]
 
-    lat_in_m = latlon2m(cell.lat, lon_origin, latlon="lat")
-    lon_in_m = latlon2m(cell.lon, lat_origin, latlon="lon")
+    lat_in_m = __get_latlon2m(topo, cell.lat, (lat_min, lat_max), lon_origin, "lat")
+    lon_in_m = __get_latlon2m(topo, cell.lon, (lon_min, lon_max), lat_origin, "lon")
 
     cell.wlat = np.diff(lat_in_m).mean()
     cell.wlon = np.diff(lon_in_m).mean()
 
+    # slice the domain-wide filtered topography, see src.utils.filter_topo
+    prefiltered = filtered and (getattr(topo, "topo_filtered", None) is not None)
+
     if rect or load_topo:
-        cell.topo = np.copy(topo.topo[lat_min:lat_max, lon_min:lon_max])
+        source = topo.topo_filtered if prefiltered else topo.topo
+        cell.topo = np.copy(source[lat_min:lat_max, lon_min:lon_max])
         cell.topo -= cell.topo.mean()
-        lon_grid_in_m, lat_grid_in_m = np.meshgrid(lon_in_m, lat_in_m)
-        shp = cell.topo.shape
 
         equid_lat = np.linspace(lat_in_m.min(), lat_in_m.max(), lat_in_m.size)
         equid_lon = np.linspace(lon_in_m.min(), lon_in_m.max(), lon_in_m.size)
 
-        equid_lon_grid, equid_lat_grid = np.meshgrid(equid_lon, equid_lat)
-
-        cell.topo = interpolate.griddata(
-            (lon_grid_in_m.ravel(), lat_grid_in_m.ravel()),
-            cell.topo.ravel(),
-            (equid_lon_grid, equid_lat_grid),
-            method="nearest",
+        # nearest-neighbour remapping onto the equidistant grid; the source grid is a tensor product, so the remapping is separable
+        key = (
+            np.round(cell.lat, 8).tobytes(),
+            np.round(cell.lon - lon_origin, 8).tobytes(),
         )
+        idx_maps = __regrid_maps.get(key, "idx")
 
-        cell.topo = cell.topo.reshape(shp)
+        if idx_maps is None:
+            idx_maps = (
+                get_nearest_idx(lat_in_m, equid_lat),
+                get_nearest_idx(lon_in_m, equid_lon),
+            )
+            __regrid_maps.put(key, "idx", idx_maps)
+
+        cell.topo = cell.topo[np.ix_(*idx_maps)]
         lat_in_m = equid_lat
         lon_in_m = equid_lon
 
         cell.wlat = np.diff(lat_in_m).mean()
         cell.wlon = np.diff(lon_in_m).mean()
 
-    if filtered:
-        ampls = np.fft.fft2(cell.topo)
-        ampls /= ampls.size
-        wlat = cell.wlat
-        wlon = cell.wlon
-
-        kks = np.fft.fftfreq(cell.topo.shape[1])
-        lls = np.fft.fftfreq(cell.topo.shape[0])
-
-        kkg, llg = np.meshgrid(kks, lls)
-
-        kls = ((2.0 * np.pi * kkg / wlon) ** 2 + (2.0 * np.pi * llg / wlat) ** 2) ** 0.5
-
-        ampls *= np.exp(-((kls / (2.0 * np.pi / 5000)) ** 2.0))
-
-        cell.topo = np.fft.ifft2(ampls * ampls.size).real
-        cell.topo -= cell.topo.mean()
+    if filtered and not (prefiltered and (rect or load_topo)):
+        filter_cell(cell, scale=getattr(topo, "filter_scale", 5000.0))
 
     if topo_mask is not None:
         cell.topo *= topo_mask
@@ -536,6 +774,8 @@ def get_lat_lon_segments(
         cell.get_masked(mask=np.ones_like(cell.topo).astype("bool"))
     elif mask is not None:
         cell.get_masked(mask=mask)
+    elif labels is not None:
+        cell.get_masked(mask=(labels[lat_min:lat_max, lon_min:lon_max] == simplex_idx))
     else:
         cell.get_masked(triangle=triangle)
 
@@ -546,6 +786,30 @@ def get_closest_idx(val, arr):
     return int(np.argmin(np.abs(arr - val)))
 
 
+def get_nearest_idx(src, tgt):
+    """Nearest-neighbour index map between two 1D grids
+
+    Parameters
+    ----------
+    src : array-like
+        ascending source grid
+    tgt : array-like
+        target grid
+
+    Returns
+    -------
+    array-like
+        indices of the points in ``src`` closest to each point in ``tgt``, ties go to the lower index
+    """
+    idx = np.searchsorted(src, tgt)
+    idx = np.clip(idx, 1, len(src) - 1)
+
+    # choose between the neighbours src[idx-1] < tgt <= src[idx]
+    idx -= (tgt - src[idx - 1]) <= (src[idx] - tgt)
+
+    return idx
+
+
 def latlon2m(arr, fix_pt, latlon):
     """Wrapper function to compute the distance of a list of values from a given fixed point (in meters).
 
@@ -570,18 +834,32 @@ def latlon2m(arr, fix_pt, latlon):
     res = np.zeros_like(arr)
     res[0] = 0.0
 
-    for cnt, idx in enumerate(range(1, len(arr))):
-        cnt += 1
-        if latlon == "lat":
-            res[cnt] = __latlon2m_converter(fix_pt, fix_pt, origin, arr[idx])
-        elif latlon == "lon":
-            res[cnt] = __latlon2m_converter(origin, arr[idx], fix_pt, fix_pt)
-        else:
-            assert 0
+    if latlon == "lat":
+        res[1:] = __latlon2m_converter(fix_pt, fix_pt, origin, arr[1:])
+    elif latlon == "lon":
+        res[1:] = __latlon2m_converter(origin, arr[1:], fix_pt, fix_pt)
+    else:
+        assert 0
 
     return res * 1000
 
 
+def __get_latlon2m(topo, arr, rng, fix_pt, latlon):
+    """Private wrapper of :func:`src.utils.latlon2m` that memoises the distances of the slice ``rng`` of the lat-lon values of ``topo`` in the table ``topo.m_table``"""
+    table = getattr(topo, "m_table", None)
+    if (table is None) or (len(arr) == 0):
+        return latlon2m(arr, fix_pt, latlon)
+
+    # the latitudinal distances do not depend on the longitude of the origin
+    origin = None if latlon == "lat" else float(fix_pt)
+    key = (latlon, rng, origin, float(arr[0]), float(arr[-1]))
+
+    if key not in table:
+        table[key] = latlon2m(arr, fix_pt, latlon)
+
+    return np.copy(table[key])
+
+
 def __latlon2m_converter(lon1, lon2, lat1, lat2):
     """Helper function for lat-lon to meters conversion
 
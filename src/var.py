@@ -51,6 +51,15 @@ class topo(object):
         self.topo = None
         self.analysis = None
 
+        # memoised lat-lon to metre conversions, see src.utils.get_lat_lon_segments
+        self.m_table = {}
+
+        # domain-wide filtered topography, see src.utils.filter_topo
+        self.topo_filtered = None
+
+        # cut-off scale in meters of src.utils.filter_topo and src.utils.filter_cell
+        self.filter_scale = 5000.0
+
 
 class topo_cell(topo):
     """
@@ -104,14 +113,11 @@ class topo_cell(topo):
         triangle : :class:`src.utils.gen_triangle`
             instance of the generate-triangle class
         """
-        lat_lon_points = self.__get_lat_lon_points()
-        init_poly = triangle.vec_get_mask
+        # the grid is rectilinear, so the rescaled coordinates are separable
+        lon = utils.rescale(np.copy(self.lon_grid[0, :]).astype(float))
+        lat = utils.rescale(np.copy(self.lat_grid[:, 0]).astype(float))
 
-        self.mask = (
-            np.array([init_poly(elem) for elem in lat_lon_points])
-            .reshape(self.lat.size, self.lon.size)
-            .astype("bool_")
-        )
+        self.mask = triangle.get_mask(lon, lat)
 
     def get_masked(self, triangle=None, mask=None):
         """Gets the masked attributes
@@ -191,7 +197,12 @@ class analysis(object):
 
         self.recon = None
 
-    def get_attrs(self, fobj, freqs):
+        # sparse representation: flat (k,l)-values and amplitudes of the non-zero modes
+        self.sparse = False
+        self.flat_idx = None
+        self.grid_shape = None
+
+    def get_attrs(self, fobj, freqs, sparse=False):
         """Copies required attributes given the arguments
 
         Parameters
@@ -200,9 +211,24 @@ class analysis(object):
             instance of the Fourier transformer
         freqs : array-like
             2D (abs. valued real) spectrum
+        sparse : bool, optional
+            stores only the non-zero modes of ``freqs`` as flat arrays without assembling the dense (k,l)-grids, by default False. See :func:`src.var.analysis.get_sparse`
         """
         self.wlat = np.copy(fobj.wlat)
         self.wlon = np.copy(fobj.wlon)
+
+        if sparse:
+            rows, cols = np.nonzero(np.isfinite(freqs) & (freqs != 0.0))
+
+            self.ampls = freqs[rows, cols]
+            self.kks = fobj.m_i[cols] / (fobj.Ni)
+            self.lls = fobj.m_j[rows] / (fobj.Nj)
+
+            self.sparse = True
+            self.flat_idx = np.ravel_multi_index((rows, cols), freqs.shape)
+            self.grid_shape = freqs.shape
+            return
+
         self.ampls = np.copy(freqs)
 
         # only works with explicitly setting the (k,l)-values
@@ -243,6 +269,66 @@ class analysis(object):
         # self.kks = self.kks / self.kks.size
         # self.lls = self.lls / self.lls.size
 
+    def get_sparse(self, ampls=None):
+        """Returns the sparse representation of a dense analysis object
+
+        Only the non-zero modes are kept as flat arrays of (k,l)-values and amplitudes, so that the memory and the cost of :func:`src.physics.ideal_pmf.compute_uw_pmf` scale with the number of modes instead of the size of the spectral grid.
+
+        Parameters
+        ----------
+        ampls : array-like, optional
+            2D spectrum on the (k,l)-grids of this object replacing ``self.ampls``, by default None
+
+        Returns
+        -------
+        :class:`src.var.analysis`
+            instance with ``sparse = True``. Use :func:`src.var.analysis.to_grid` to scatter flat arrays back onto the dense grid
+        """
+        if self.sparse:
+            assert ampls is None
+            return self
+
+        ampls = self.ampls if ampls is None else ampls
+        kks, lls = np.broadcast_arrays(self.kks, self.lls)
+
+        flat_idx = np.flatnonzero(np.isfinite(ampls) & (ampls != 0.0))
+
+        analysis_sp = analysis()
+        analysis_sp.wlat = self.wlat
+        analysis_sp.wlon = self.wlon
+        analysis_sp.ampls = ampls.ravel()[flat_idx]
+        analysis_sp.kks = kks.ravel()[flat_idx]
+        analysis_sp.lls = lls.ravel()[flat_idx]
+        analysis_sp.recon = self.recon
+
+        analysis_sp.sparse = True
+        analysis_sp.flat_idx = flat_idx
+        analysis_sp.grid_shape = ampls.shape
+
+        return analysis_sp
+
+    def to_grid(self, vals=None):
+        """Scatters flat values of the sparse representation onto the dense spectral grid
+
+        Parameters
+        ----------
+        vals : array-like, optional
+            flat values, one per mode, e.g., the spectrum returned by :func:`src.physics.ideal_pmf.compute_uw_pmf`, by default None, i.e., ``self.ampls``
+
+        Returns
+        -------
+        array-like
+            2D array of shape ``self.grid_shape``, zero outside of the modes
+        """
+        assert self.sparse
+
+        vals = self.ampls if vals is None else vals
+
+        grid = np.zeros(self.grid_shape, dtype=np.result_type(vals))
+        grid.flat[self.flat_idx] = vals
+
+        return grid
+
     #         self.clat = ma.getdata(df.variables['clat'][:])
     # clat_vertices = ma.getdata(df.variables['clat_vertices'][:])
     # clon = ma.getdata(df.variables['clon'][:])
@@ -334,10 +420,30 @@ class params(obj):
 
         self.fa_iter_solve = True
         self.sa_iter_solve = True
+        self.assembly = "dense"  # "fft", "matfree" or "chunked", see src.lin_reg.do
+        self.max_bytes = 2**28  # memory budget of the "chunked" assembly
+        self.fa_solver = None  # overrides fa_iter_solve, see src.lin_reg.do
+        self.sa_solver = None  # overrides sa_iter_solve
+        self.sketch_oversample = 4.0  # accuracy of the "sketch" solver
+        self.sketch = "srtt"  # or "gaussian", see src.lin_reg.get_sketch
+        self.sketch_seed = None  # seed of the random sketch
+        self.warm_start = False  # initial guess over the same modes
+        self.cache_bytes = None  # byte budget, see src.utils.lru_cache
+        self.sa_select = None  # "omp" selects the SA modes by matching pursuit
+        self.omp_tol = 0.0  # stopping tolerance, see src.lin_reg.omp
+        self.refine_reuse = False  # reuse the first pass in iterative refinement, see interface.first_appx.refine
+        self.sparse_output = False  # write the SA spectra as flat (k, l, amplitude)
+        self.label_raster = False  # SA masks from src.delaunay.get_labels
+        self.prefilter = (
+            False  # filter the whole domain once, see src.utils.filter_topo
+        )
+        self.filter_scale = 5000.0  # cut-off scale in meters, see src.var.topo
 
         # Penalty terms
         self.lmbda_fa = 1e-2  # first guess
         self.lmbda_sa = 1e-1  # second step
+        self.lmbda_select = None  # "gcv" or "lcurve" overrides lmbda_fa and lmbda_sa
+        self.lmbda_path = np.logspace(-6, 1, 29)  # candidates for lmbda_select
 
         # Tapering parameters
         self.taper_ref = False
@@ -5,7 +5,6 @@ Diagnostic wrapper module to ease setting up the CSAM building blocks
 import numpy as np
 from src import physics
 from vis import plotter
-from copy import deepcopy
 
 import matplotlib.pyplot as plt
 
@@ -109,9 +108,8 @@ class delaunay_metrics(object):
         self.ampls_1 = self.t1.analysis.ampls
         self.ampls_sum = self.ampls_0 + self.ampls_1
 
-        # consider replacing deepcopy with copy method.
-        analysis_sum = deepcopy(self.t0.analysis)
-        analysis_sum.ampls = self.ampls_sum
+        # only the non-zero modes of the summed spectrum enter the computation
+        analysis_sum = self.t0.analysis.get_sparse(ampls=self.ampls_sum)
 
         ideal = physics.ideal_pmf(U=self.params.U, V=self.params.V)
 
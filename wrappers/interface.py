@@ -5,7 +5,7 @@ Interface wrapper module to ease setting up the CSAM building blocks
 
 from src import fourier, lin_reg, physics, reconstruction
 from src import utils, var
-from copy import deepcopy
+from copy import copy, deepcopy
 import numpy as np
 
 
@@ -15,7 +15,7 @@ class get_pmf(object):
     This class is used in the idealised experiments
     """
 
-    def __init__(self, nhi, nhj, U, V, debug=False):
+    def __init__(self, nhi, nhj, U, V, debug=False, cache=None):
         """
 
         Parameters
@@ -30,8 +30,10 @@ class get_pmf(object):
             wind speed in the second horizontal direction
         debug : bool, optional
             debug flag, by default False
+        cache : :class:`src.utils.lru_cache`, optional
+            cache of the spectrum of the sampling mask keyed by the cell geometry, see :func:`src.lin_reg.get_mask_spectrum`. By default None
         """
-        self.fobj = fourier.f_trans(nhi, nhj)
+        self.fobj = fourier.f_trans(nhi, nhj, cache=cache)
 
         self.U = U
         self.V = V
@@ -49,17 +51,58 @@ class get_pmf(object):
             regulariser factor, by default 0.1
         scale : float, optional
             scales the amplitudes for debugging purposes, by default 1.0
+
+        .. note:: The ``M`` matrix is released after the linear regression unless the keyword argument ``keep_coeffs`` is True, as required by a later call to :func:`wrappers.interface.get_pmf.refine` with an iterative solver.
+
+        .. note:: If the keyword argument ``lmbda_select`` is ``gcv`` or ``lcurve``, ``lmbda`` is ignored and the regularisation parameter is selected from the keyword argument ``lmbdas`` via :func:`src.lin_reg.reg_path`.
         """
         #   summed=False, updt_analysis=False, scale=1.0, refine=False, iter_solve=False):
-        self.fobj.do_full(cell)
+        self.fobj.do_modes(cell)
 
-        am, data_recons = lin_reg.do(
-            self.fobj,
-            cell,
-            lmbda,
-            kwargs.get("iter_solve", True),
-            kwargs.get("save_coeffs", False),
+        # the M matrix is not required if M^T M is diagonal, see src.lin_reg.is_orthogonal
+        diag_path = (kwargs.get("lmbda_select", None) is None) and (
+            kwargs.get("solver", None) not in ["sketch", "lsqr"]
         )
+        diag_path = diag_path and not kwargs.get("save_coeffs", False)
+        diag_path = diag_path and lin_reg.is_orthogonal(self.fobj)
+
+        assembly = kwargs.get("assembly", "dense")
+        if (assembly not in ["matfree", "chunked"]) and (not diag_path):
+            self.fobj.do_full(cell)
+
+        if kwargs.get("lmbda_select", None) is not None:
+            # pick the regularisation parameter for this cell from a regularisation path
+            lmbdas = kwargs.get("lmbdas")
+            a_ms, recons, _, lmbda_idx = lin_reg.reg_path(
+                self.fobj,
+                cell,
+                lmbdas,
+                assembly=kwargs.get("assembly", "dense"),
+                select=kwargs.get("lmbda_select"),
+                keep_coeffs=kwargs.get("refine", False)
+                or kwargs.get("keep_coeffs", False),
+            )
+            am, data_recons = a_ms[lmbda_idx], recons[lmbda_idx]
+            lmbda = lmbdas[lmbda_idx]
+            self.fobj.lmbda = lmbda
+        else:
+            am, data_recons = lin_reg.do(
+                self.fobj,
+                cell,
+                lmbda,
+                kwargs.get("iter_solve", True),
+                kwargs.get("save_coeffs", False),
+                assembly=kwargs.get("assembly", "dense"),
+                solver=kwargs.get("solver", None),
+                oversample=kwargs.get("oversample", 4.0),
+                sketch=kwargs.get("sketch", "srtt"),
+                seed=kwargs.get("seed", None),
+                x0=kwargs.get("x0", None),
+                max_bytes=kwargs.get("max_bytes", 2**28),
+                verbose=kwargs.get("verbose", False),
+                keep_coeffs=kwargs.get("refine", False)
+                or kwargs.get("keep_coeffs", False),
+            )
 
         if kwargs.get("save_am", False):
             self.fobj.a_m = am
@@ -70,12 +113,115 @@ class get_pmf(object):
         if kwargs.get("refine", False):
             cell.topo_m -= data_recons
             am, data_recons = lin_reg.do(
-                self.fobj, cell, lmbda, kwargs.get("iter_solve", True)
+                self.fobj,
+                cell,
+                lmbda,
+                kwargs.get("iter_solve", True),
+                assembly=kwargs.get("assembly", "dense"),
+                solver=kwargs.get("solver", None),
+                oversample=kwargs.get("oversample", 4.0),
+                sketch=kwargs.get("sketch", "srtt"),
+                seed=kwargs.get("seed", None),
+                max_bytes=kwargs.get("max_bytes", 2**28),
+                verbose=kwargs.get("verbose", False),
             )
 
             self.fobj.get_freq_grid(am)
             freqs += scale * np.abs(self.fobj.ampls)
 
+        return self.get_analysis(cell, freqs, data_recons, **kwargs)
+
+    def refine(self, cell, topo, lmbda=0.1, scale=1.0, **kwargs):
+        """Redoes the constrained spectral approximation of the last call to :func:`wrappers.interface.get_pmf.sappx` for a new topography over the same grid cell, e.g., the residual topography in an iterative refinement pass
+
+        The spectral modes, the ``M`` matrix and the factorisation of the normal matrix are reused, so that each call only costs a new right-hand side and a back-substitution.
+
+        Parameters
+        ----------
+        cell : :class:`src.var.topo_cell`
+            instance of the cell object passed to :func:`wrappers.interface.get_pmf.sappx`
+        topo : array-like
+            2D topography on the grid of ``cell``
+        lmbda : float, optional
+            regulariser factor, by default 0.1. Ignored if the regulariser factor was selected in :func:`wrappers.interface.get_pmf.sappx`
+        scale : float, optional
+            scales the amplitudes for debugging purposes, by default 1.0
+
+        Returns
+        -------
+        tuple
+            see :func:`wrappers.interface.get_pmf.get_analysis`
+        """
+        assert topo.shape == cell.topo.shape
+
+        cell.topo = topo
+        cell.get_masked(mask=cell.mask)
+        cell.topo_m -= cell.topo_m.mean()
+
+        lmbda = getattr(self.fobj, "lmbda", lmbda)
+
+        # direct solvers keep their factorisation between calls, see src.lin_reg.do
+        assembly = kwargs.get("assembly", "dense")
+        solver = kwargs.get("solver", None)
+        if (solver is None) and (assembly != "matfree"):
+            solver = "cholesky"
+
+        am, data_recons = lin_reg.do(
+            self.fobj,
+            cell,
+            lmbda,
+            assembly=assembly,
+            solver=solver,
+            oversample=kwargs.get("oversample", 4.0),
+            sketch=kwargs.get("sketch", "srtt"),
+            seed=kwargs.get("seed", None),
+            max_bytes=kwargs.get("max_bytes", 2**28),
+            keep_coeffs=True,
+            verbose=kwargs.get("verbose", False),
+        )
+
+        self.fobj.get_freq_grid(am)
+        freqs = scale * np.abs(self.fobj.ampls)
+
+        return self.get_analysis(cell, freqs, data_recons, **kwargs)
+
+    def get_telemetry(self, **kwargs):
+        """Method to collect the convergence telemetry of the iterative solver, see :func:`src.lin_reg.do`
+
+        Returns
+        -------
+        dict
+            convergence flag ``info``, number of iterations ``n_iters`` and relative residual ``res_norm`` of the last linear regression, None if a direct solver was used, and the keyword arguments
+        """
+        telemetry = {
+            "info": getattr(self.fobj, "info", None),
+            "n_iters": getattr(self.fobj, "n_iters", None),
+            "res_norm": getattr(self.fobj, "res_norm", None),
+        }
+        telemetry.update(kwargs)
+
+        return telemetry
+
+    def get_analysis(self, cell, freqs, data_recons, **kwargs):
+        """Method to compute the reconstruction and the idealised pseudo-momentum fluxes from the solution of the linear regression
+
+        Parameters
+        ----------
+        cell : :class:`src.var.topo_cell`
+            instance of the cell object
+        freqs : array-like
+            2D (abs. valued real) spectrum
+        data_recons : array-like
+            vector-like topography reconstructed by :func:`src.lin_reg.do`
+
+        Returns
+        -------
+        tuple
+            returns tuple containing:
+                | (computed spectrum,
+                | computed idealised pseudo-momentum fluxes,
+                | the reconstructed physical data)
+        """
         if self.debug:
             print("data_recons: ", data_recons.min(), data_recons.max())
 
@@ -84,20 +230,30 @@ class get_pmf(object):
         if self.debug:
             print("dat_2D: ", dat_2D.min(), dat_2D.max())
 
+        # the dense spectral grids are only assembled if the cell keeps the analysis
         analysis = var.analysis()
-        analysis.get_attrs(self.fobj, freqs)
+        analysis.get_attrs(self.fobj, freqs, sparse=not kwargs.get("updt_analysis"))
         analysis.recon = dat_2D
 
         if kwargs.get("updt_analysis"):
             cell.analysis = analysis
 
-        ideal = physics.ideal_pmf(U=self.U, V=self.V)
-        uw_pmf_freqs = ideal.compute_uw_pmf(
-            analysis, summed=kwargs.get("summed", False)
-        )
+        uw_pmf_freqs = self.__get_uw_pmf(analysis, kwargs.get("summed", False))
 
         return freqs, uw_pmf_freqs, dat_2D
 
+    def __get_uw_pmf(self, analysis, summed):
+        """Private method computing the idealised pseudo-momentum fluxes over the non-zero modes of the spectrum only"""
+        analysis = analysis.get_sparse()
+
+        ideal = physics.ideal_pmf(U=self.U, V=self.V)
+        uw_pmf_freqs = ideal.compute_uw_pmf(analysis, summed=summed)
+
+        if summed:
+            return uw_pmf_freqs
+        else:
+            return analysis.to_grid(uw_pmf_freqs)
+
     def dfft(self, cell, summed=False, updt_analysis=False):
         r"""Wrapper that performs discrete fast-Fourier transform on a quadrilateral grid cell
 
@@ -212,21 +368,14 @@ class get_pmf(object):
                 | computed idealised pseudo-momentum fluxes,
                 | the reconstructed physical data)
         """
-        self.fobj.do_full(cell)
-
-        _, _ = lin_reg.do(
-            self.fobj,
-            cell,
-            lmbda,
-            kwargs.get("iter_solve", True),
-            kwargs.get("save_coeffs", False),
-        )
+        # the amplitudes are synthesised on the grid of the cell without assembling the M matrix
+        self.fobj.do_modes(cell)
 
         am = fobj.a_m
         self.fobj.get_freq_grid(am)
         freqs = np.abs(self.fobj.ampls)
 
-        data_recons = self.fobj.coeff.dot(am)
+        data_recons = reconstruction.synthesise(self.fobj, am)[self.fobj.J, self.fobj.I]
         dat_2D = reconstruction.recon_2D(data_recons, cell)
 
         analysis = var.analysis()
@@ -236,14 +385,56 @@ class get_pmf(object):
         if kwargs.get("updt_analysis", True):
             cell.analysis = analysis
 
-        ideal = physics.ideal_pmf(U=self.U, V=self.V)
-        uw_pmf_freqs = ideal.compute_uw_pmf(
-            analysis, summed=kwargs.get("summed", False)
-        )
+        uw_pmf_freqs = self.__get_uw_pmf(analysis, kwargs.get("summed", False))
 
         return freqs, uw_pmf_freqs, dat_2D
 
 
+def sappx_batch(pmfs, cells, lmbda=0.1, scale=1.0, **kwargs):
+    """Batched counterpart of :func:`wrappers.interface.get_pmf.sappx`, where the linear regression of all cells is done by :func:`src.lin_reg.do_batch`
+
+    Parameters
+    ----------
+    pmfs : list
+        list of :class:`wrappers.interface.get_pmf` instances, one per cell
+    cells : list
+        list of :class:`src.var.topo_cell` instances
+    lmbda : float, optional
+        regulariser factor, by default 0.1
+    scale : float, optional
+        scales the amplitudes for debugging purposes, by default 1.0
+
+    Returns
+    -------
+    list
+        list of tuples returned by :func:`wrappers.interface.get_pmf.get_analysis`, one per cell
+    """
+    fobjs = [pmf.fobj for pmf in pmfs]
+
+    # the M matrix is not required if M^T M is diagonal, see src.lin_reg.is_orthogonal
+    for fobj, cell in zip(fobjs, cells):
+        fobj.do_modes(cell)
+
+        if not lin_reg.is_orthogonal(fobj):
+            fobj.do_full(cell)
+
+    sols = lin_reg.do_batch(
+        fobjs, cells, lmbda, assembly=kwargs.get("assembly", "dense")
+    )
+
+    res = []
+    for pmf, cell, (am, data_recons) in zip(pmfs, cells, sols):
+        if kwargs.get("save_am", False):
+            pmf.fobj.a_m = am
+
+        pmf.fobj.get_freq_grid(am)
+        freqs = scale * np.abs(pmf.fobj.ampls)
+
+        res.append(pmf.get_analysis(cell, freqs, data_recons, **kwargs))
+
+    return res
+
+
 def taper_quad(params, simplex_lat, simplex_lon, cell, topo):
     """Applies tapering to a quadrilateral grid cell
 
@@ -259,6 +450,11 @@ def taper_quad(params, simplex_lat, simplex_lon, cell, topo):
         instance of a cell object
     topo : :class:`src.var.topo` or :class:`src.var.topo_cell`
         instance of an object with topography attribute
+
+    Returns
+    -------
+    array-like
+        2D tapering mask applied to the topography
     """
     # get quadrilateral mask
     utils.get_lat_lon_segments(simplex_lat, simplex_lon, cell, topo, rect=True)
@@ -278,8 +474,19 @@ def taper_quad(params, simplex_lat, simplex_lon, cell, topo):
         topo_mask=taper.p,
     )
 
+    return taper.p
+
 
-def taper_nonquad(params, simplex_lat, simplex_lon, cell, topo, res_topo=None):
+def taper_nonquad(
+    params,
+    simplex_lat,
+    simplex_lon,
+    cell,
+    topo,
+    res_topo=None,
+    labels=None,
+    simplex_idx=None,
+):
     """Applies tapering to a non-quadrilateral grid cell
 
     Parameters
@@ -296,6 +503,15 @@ def taper_nonquad(params, simplex_lat, simplex_lon, cell, topo, res_topo=None):
         instance of an object with topography attributes
     res_topo : array-like, optional
         residual orography, only required in iterative refinement, by default None
+    labels : array-like, optional
+        ownership raster of the data points in ``topo``, see :func:`src.delaunay.get_labels`, by default None
+    simplex_idx : int, optional
+        index of the grid cell in the ownership raster, by default None
+
+    Returns
+    -------
+    array-like
+        2D tapering mask applied to the topography
     """
     # get tapered mask with padding
     taper = utils.taper(cell, params.padding, art_it=params.taper_art_it)
@@ -318,6 +534,8 @@ def taper_nonquad(params, simplex_lat, simplex_lon, cell, topo, res_topo=None):
         rect=False,
         padding=params.padding,
         filtered=False,
+        labels=labels,
+        simplex_idx=simplex_idx,
     )
     # mask_taper = np.copy(cell.mask)
 
@@ -338,6 +556,8 @@ def taper_nonquad(params, simplex_lat, simplex_lon, cell, topo, res_topo=None):
     # cell.topo = taper.p * cell.topo * mask
     # cell.mask = mask
 
+    return taper.p
+
 
 class first_appx(object):
     """Wrapper class corresponding to the First Approximation step
@@ -362,6 +582,15 @@ class first_appx(object):
         self.params = params
         self.topo = topo
 
+        self.cache = utils.lru_cache(params.cache_bytes) if params.cache_bytes else None
+
+        # solution of the previous call and convergence telemetry per call
+        self.x0 = None
+        self.telemetry = []
+
+        # cell and solver of the previous call if params.refine_reuse, see first_appx.refine
+        self.last = None
+
     def do(self, simplex_lat, simplex_lon, res_topo=None):
         """Do the First Approximation step
 
@@ -387,6 +616,123 @@ class first_appx(object):
 
             corresponding to ``sols`` in :func:`wrappers.diagnostics.diag_plotter.show`
         """
+        cell_fa = self.__get_cell(simplex_lat, simplex_lon, res_topo)
+
+        first_guess = get_pmf(
+            self.nhi, self.nhj, self.params.U, self.params.V, cache=self.cache
+        )
+
+        # warm-start from the previous refinement pass over the same grid cell
+        key = (tuple(simplex_lat), tuple(simplex_lon))
+        if self.params.warm_start and (self.x0 is not None) and (self.x0[0] == key):
+            x0 = self.x0[1]
+        else:
+            x0 = None
+
+        ampls_fa, uw_fa, dat_2D_fa = first_guess.sappx(
+            cell_fa,
+            lmbda=self.params.lmbda_fa,
+            iter_solve=self.params.fa_iter_solve,
+            save_am=self.params.warm_start,
+            assembly=self.params.assembly,
+            solver=self.params.fa_solver,
+            oversample=self.params.sketch_oversample,
+            sketch=self.params.sketch,
+            seed=self.params.sketch_seed,
+            max_bytes=self.params.max_bytes,
+            verbose=self.params.verbose,
+            x0=x0,
+            lmbda_select=self.params.lmbda_select,
+            lmbdas=self.params.lmbda_path,
+            keep_coeffs=self.params.refine_reuse,
+        )
+
+        self.telemetry.append(first_guess.get_telemetry(simplex_lat=simplex_lat))
+        if self.params.warm_start:
+            self.x0 = (key, first_guess.fobj.a_m)
+
+        if (res_topo is None) and self.params.refine_reuse:
+            self.last = (cell_fa, first_guess)
+
+        return cell_fa, ampls_fa, uw_fa, dat_2D_fa
+
+    def refine(self, res_topo):
+        """Does an iterative refinement pass of the First Approximation step over the grid cell of the last call to :func:`wrappers.interface.first_appx.do`
+
+        Unlike ``do(simplex_lat, simplex_lon, res_topo=res_topo)``, the grid cell is not rebuilt and the linear regression reuses the factorisation of the first pass, see :func:`wrappers.interface.get_pmf.refine`. Requires ``params.refine_reuse = True``.
+
+        As in ``do``, the residual orography is low-pass filtered with :func:`src.utils.filter_cell` and not tapered. However, ``do`` recomputes the coordinates of the data points from the lat-lon values of the cell, which lie off the equidistant grid of the residual orography and shift the grid indices of the linear regression, see :func:`src.fourier.f_trans.do_full`. ``refine`` keeps the grid of the first pass, so that the two methods do not give identical results.
+
+        Parameters
+        ----------
+        res_topo : array-like
+            residual orography over the quadrilateral grid cell
+
+        Returns
+        -------
+        tuple
+            see :func:`wrappers.interface.first_appx.do`
+        """
+        assert (
+            self.last is not None
+        ), "first_appx.do has to be called first with params.refine_reuse = True"
+        cell_fa, first_guess = self.last
+
+        # leave the cell of the first pass untouched
+        cell_fa = copy(cell_fa)
+        cell_fa.topo = np.copy(res_topo)
+        utils.filter_cell(cell_fa, scale=getattr(self.topo, "filter_scale", 5000.0))
+
+        ampls_fa, uw_fa, dat_2D_fa = first_guess.refine(
+            cell_fa,
+            cell_fa.topo,
+            lmbda=self.params.lmbda_fa,
+            updt_analysis=True,
+            assembly=self.params.assembly,
+            solver=self.params.fa_solver,
+            oversample=self.params.sketch_oversample,
+            sketch=self.params.sketch,
+            seed=self.params.sketch_seed,
+            max_bytes=self.params.max_bytes,
+            verbose=self.params.verbose,
+        )
+
+        self.telemetry.append(first_guess.get_telemetry(refine=True))
+
+        return cell_fa, ampls_fa, uw_fa, dat_2D_fa
+
+    def do_batch(self, simplex_lats, simplex_lons):
+        """Do the First Approximation step for several quadrilateral grid cells, solving the linear regressions with :func:`wrappers.interface.sappx_batch`
+
+        Parameters
+        ----------
+        simplex_lats : list
+            list of the latitudinal coordinates of the vertices of each grid cell
+        simplex_lons : list
+            list of the longitudinal coordinates of the vertices of each grid cell
+
+        Returns
+        -------
+        list
+            list of tuples as returned by :func:`wrappers.interface.first_appx.do`, one per grid cell
+        """
+        cells = [
+            self.__get_cell(simplex_lat, simplex_lon)
+            for simplex_lat, simplex_lon in zip(simplex_lats, simplex_lons)
+        ]
+        pmfs = [
+            get_pmf(self.nhi, self.nhj, self.params.U, self.params.V, cache=self.cache)
+            for _ in cells
+        ]
+
+        sols = sappx_batch(
+            pmfs, cells, lmbda=self.params.lmbda_fa, assembly=self.params.assembly
+        )
+
+        return [(cell,) + sol for cell, sol in zip(cells, sols)]
+
+    def __get_cell(self, simplex_lat, simplex_lon, res_topo=None):
+        """Private method that populates the cell object of the First Approximation step"""
         cell_fa = var.topo_cell()
 
         if res_topo is None:
@@ -408,12 +754,7 @@ class first_appx(object):
                 mask=np.ones_like(res_topo).astype(bool),
             )
 
-        first_guess = get_pmf(self.nhi, self.nhj, self.params.U, self.params.V)
-
-        ampls_fa, uw_fa, dat_2D_fa = first_guess.sappx(
-            cell_fa, lmbda=self.params.lmbda_fa, iter_solve=self.params.fa_iter_solve
-        )
-        return cell_fa, ampls_fa, uw_fa, dat_2D_fa
+        return cell_fa
 
 
 class second_appx(object):
@@ -443,6 +784,15 @@ class second_appx(object):
         self.nhi, self.nhj = nhi, nhj
         self.n_modes = params.n_modes
 
+        self.cache = utils.lru_cache(params.cache_bytes) if params.cache_bytes else None
+
+        # solution of the previous call and convergence telemetry per call
+        self.x0 = None
+        self.telemetry = []
+
+        # cells, solvers and tapering masks of the current triangle pair if params.refine_reuse, see second_appx.refine
+        self.last = {}
+
     def do(self, idx, ampls_fa, res_topo=None):
         """Do the Second Approximation step
 
@@ -469,6 +819,147 @@ class second_appx(object):
 
             If ``params.recompute_rhs = True``, the tuple contains two lists. The first list is the contains the data above, and the second list contains the data from the recomputation over the quadrilateral domain.
         """
+        cell, second_guess, weights = self.__prepare(idx, ampls_fa, res_topo)
+
+        save_am = True if self.params.recompute_rhs else False
+        save_am = save_am or self.params.warm_start
+
+        # warm-start from the previous solve over the same spectral modes, in the same order
+        modes = (tuple(second_guess.fobj.k_idx), tuple(second_guess.fobj.l_idx))
+        if self.params.warm_start and (self.x0 is not None) and (self.x0[0] == modes):
+            x0 = self.x0[1]
+        else:
+            x0 = None
+
+        ampls_sa, uw_sa, dat_2D_sa = second_guess.sappx(
+            cell,
+            lmbda=self.params.lmbda_sa,
+            updt_analysis=True,
+            scale=1.0,
+            iter_solve=self.params.sa_iter_solve,
+            save_am=save_am,
+            assembly=self.params.assembly,
+            solver=self.params.sa_solver,
+            oversample=self.params.sketch_oversample,
+            sketch=self.params.sketch,
+            seed=self.params.sketch_seed,
+            max_bytes=self.params.max_bytes,
+            verbose=self.params.verbose,
+            x0=x0,
+            lmbda_select=self.params.lmbda_select,
+            lmbdas=self.params.lmbda_path,
+            keep_coeffs=self.params.refine_reuse,
+        )
+
+        self.telemetry.append(second_guess.get_telemetry(idx=idx))
+        if self.params.warm_start:
+            self.x0 = (modes, second_guess.fobj.a_m)
+
+        if (res_topo is None) and self.params.refine_reuse:
+            self.last = {
+                key: val for key, val in self.last.items() if key // 2 == idx // 2
+            }
+            self.last[idx] = (cell, second_guess, weights)
+
+        if self.params.recompute_rhs:
+            cell_quad = deepcopy(cell)
+            cell_quad.get_masked(mask=np.ones_like(cell.topo).astype("bool"))
+            ampls_02_rc, uw_02_rc, dat_2D_02_rc = second_guess.recompute_rhs(
+                cell_quad, second_guess.fobj, save_coeffs=True
+            )
+
+            return [cell_quad, ampls_sa, uw_sa, dat_2D_sa], [
+                cell,
+                ampls_02_rc,
+                uw_02_rc,
+                dat_2D_02_rc,
+            ]
+        else:
+            return cell, ampls_sa, uw_sa, dat_2D_sa
+
+    def refine(self, idx, res_topo):
+        """Does an iterative refinement pass of the Second Approximation step over the grid cell ``idx`` of the last call to :func:`wrappers.interface.second_appx.do`
+
+        Unlike ``do(idx, ampls_fa, res_topo=res_topo)``, the spectral modes selected in the first pass are kept and the linear regression reuses its factorisation, see :func:`wrappers.interface.get_pmf.refine`. Requires ``params.refine_reuse = True``.
+
+        As in ``do``, the residual orography is tapered but not filtered. Unlike ``do`` with ``params.taper_sa = True``, ``res_topo`` is not tapered in place.
+
+        Parameters
+        ----------
+        idx : int
+            index of the non-quadrilateral grid cell
+        res_topo : array-like
+            residual orography over the quadrilateral grid cell
+
+        Returns
+        -------
+        tuple
+            see :func:`wrappers.interface.second_appx.do`. Does not support ``params.recompute_rhs = True``.
+        """
+        assert (
+            idx in self.last
+        ), "second_appx.do has to be called first for idx with params.refine_reuse = True"
+        cell, second_guess, weights = self.last[idx]
+
+        # leave the cell of the first pass untouched
+        cell = copy(cell)
+
+        ampls_sa, uw_sa, dat_2D_sa = second_guess.refine(
+            cell,
+            res_topo * weights,
+            lmbda=self.params.lmbda_sa,
+            updt_analysis=True,
+            assembly=self.params.assembly,
+            solver=self.params.sa_solver,
+            oversample=self.params.sketch_oversample,
+            sketch=self.params.sketch,
+            seed=self.params.sketch_seed,
+            max_bytes=self.params.max_bytes,
+            verbose=self.params.verbose,
+        )
+
+        self.telemetry.append(second_guess.get_telemetry(idx=idx, refine=True))
+
+        return cell, ampls_sa, uw_sa, dat_2D_sa
+
+    def do_batch(self, idxs, ampls_fas):
+        """Do the Second Approximation step for several non-quadrilateral grid cells, solving the linear regressions with :func:`wrappers.interface.sappx_batch`
+
+        Parameters
+        ----------
+        idxs : list
+            list of indices of the non-quadrilateral grid cells
+        ampls_fas : list
+            list of spectral modes identified in the first approximation step, one per grid cell
+
+        Returns
+        -------
+        list
+            list of tuples as returned by :func:`wrappers.interface.second_appx.do`, one per grid cell
+
+        .. note:: Does not support ``params.recompute_rhs = True``.
+        """
+        assert not self.params.recompute_rhs, "do_batch does not support recompute_rhs"
+
+        cells, pmfs = [], []
+        for idx, ampls_fa in zip(idxs, ampls_fas):
+            cell, second_guess, _ = self.__prepare(idx, ampls_fa)
+            cells.append(cell)
+            pmfs.append(second_guess)
+
+        sols = sappx_batch(
+            pmfs,
+            cells,
+            lmbda=self.params.lmbda_sa,
+            updt_analysis=True,
+            scale=1.0,
+            assembly=self.params.assembly,
+        )
+
+        return [(cell,) + sol for cell, sol in zip(cells, sols)]
+
+    def __prepare(self, idx, ampls_fa, res_topo=None):
+        """Private method that populates the cell object and selects the spectral modes of the Second Approximation step, and returns them together with the tapering mask applied to the topography"""
         # make a copy of the spectrum obtained from the FA.
         fq_cpy = np.copy(ampls_fa)
         fq_cpy[
@@ -483,26 +974,52 @@ class second_appx(object):
         # use the non-quadrilateral self.topography
         utils.get_lat_lon_segments(simplex_lat, simplex_lon, cell, self.topo, rect=True)
 
-        save_am = True if self.params.recompute_rhs else False
-
         if (res_topo is not None) and (not self.params.taper_sa):
             cell.topo = res_topo * cell.mask
 
+        # the ownership raster is only available if requested in src.delaunay.get_decomposition
+        labels = getattr(self.tri, "labels", None)
+
         utils.get_lat_lon_segments(
-            simplex_lat, simplex_lon, cell, self.topo, rect=False, filtered=False
+            simplex_lat,
+            simplex_lon,
+            cell,
+            self.topo,
+            rect=False,
+            filtered=False,
+            labels=labels,
+            simplex_idx=idx,
         )
 
+        weights = 1.0
         if self.params.taper_sa:
-            taper_nonquad(
+            weights = taper_nonquad(
                 self.params,
                 simplex_lat,
                 simplex_lon,
                 cell,
                 self.topo,
                 res_topo=res_topo,
+                labels=labels,
+                simplex_idx=idx,
             )
 
-        second_guess = get_pmf(self.nhi, self.nhj, self.params.U, self.params.V)
+        second_guess = get_pmf(
+            self.nhi, self.nhj, self.params.U, self.params.V, cache=self.cache
+        )
+
+        if self.params.sa_select == "omp":
+            assert not self.params.dfft_first_guess
+
+            # select the modes by their correlation with the residual on the non-quadrilateral cell
+            candidates = fourier.f_trans(self.nhi, self.nhj)
+            candidates.do_modes(cell)
+            k_idxs, l_idxs, _ = lin_reg.omp(
+                candidates, cell, self.n_modes, tol=self.params.omp_tol
+            )
+            second_guess.fobj.set_kls(k_idxs, l_idxs, recompute_nhij=False)
+
+            return cell, second_guess, weights
 
         indices = []
         modes_cnt = 0
@@ -528,27 +1045,4 @@ class second_appx(object):
         else:
             second_guess.fobj.set_kls(k_idxs, l_idxs, recompute_nhij=False)
 
-        ampls_sa, uw_sa, dat_2D_sa = second_guess.sappx(
-            cell,
-            lmbda=self.params.lmbda_sa,
-            updt_analysis=True,
-            scale=1.0,
-            iter_solve=self.params.sa_iter_solve,
-            save_am=save_am,
-        )
-
-        if self.params.recompute_rhs:
-            cell_quad = deepcopy(cell)
-            cell_quad.get_masked(mask=np.ones_like(cell.topo).astype("bool"))
-            ampls_02_rc, uw_02_rc, dat_2D_02_rc = second_guess.recompute_rhs(
-                cell_quad, second_guess.fobj, save_coeffs=True
-            )
-
-            return [cell_quad, ampls_sa, uw_sa, dat_2D_sa], [
-                cell,
-                ampls_02_rc,
-                uw_02_rc,
-                dat_2D_02_rc,
-            ]
-        else:
-            return cell, ampls_sa, uw_sa, dat_2D_sa
+        return cell, second_guess, weights